@@ -0,0 +1,144 @@
+# Verificação de regressão de desempenho - Compiladores
+# roda os benchmarks do Scanner (bench_lexer) e compara com a baseline versionada;
+# falha (código 1) quando algum cenário fica mais lento ou usa mais memória do que
+# o limite permite
+#
+#   python bench_gate.py               # compara com bench_baseline.json
+#   python bench_gate.py --atualizar   # regrava a baseline (depois de uma mudança aceita)
+#
+# controle de ruído: cada cenário roda várias vezes após o aquecimento e a vazão
+# comparada é a da melhor execução (menos sensível a interferência de outros
+# processos que a mediana, que é mostrada junto com a IQR relativa); um cenário que
+# parece ter regredido é medido de novo (--confirmacoes) antes de falhar.
+# os números da baseline dependem da máquina: gere-a no ambiente em que a verificação roda
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from bench_lexer import executa, formata_tamanho, le_tamanho
+from lexer_manual import ENGINES
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+TAMANHOS_PADRAO = "64K,1M"
+LIMITE_PADRAO = 0.15  # fração de piora tolerada
+
+# um cenário comparado: vazão da melhor execução e memória por token
+def _resumo(resultado: Dict) -> Dict[str, float]:
+  resumo = {
+    "mb_s": resultado["mb_s"],
+    "mb_s_mediana": resultado["bytes"] / 1e6 / resultado["mediana"],
+    "iqr_relativa": resultado["iqr"] / resultado["mediana"],
+  }
+  if "bytes_por_token" in resultado:
+    resumo["bytes_por_token"] = resultado["bytes_por_token"]
+  return resumo
+
+def _chave(resultado: Dict) -> Tuple[str, int]:
+  return resultado["cenario"], resultado["bytes"]
+
+# compara o relatório atual com a baseline
+# retorna linhas (cenário, tamanho, métrica, base, atual, variação, situação) e se houve regressão
+def compara(atual: Dict, base: Dict, limite: float = LIMITE_PADRAO) -> Tuple[List[Tuple], bool]:
+  anteriores = {_chave(r): _resumo(r) for r in base["resultados"]}
+  linhas = []
+  regrediu = False
+  for resultado in atual["resultados"]:
+    agora = _resumo(resultado)
+    antes = anteriores.get(_chave(resultado))
+    nome, tamanho = _chave(resultado)
+    if antes is None:
+      linhas.append((nome, tamanho, "mb_s", None, agora["mb_s"], None, "novo"))
+      continue
+    # vazão: menor é pior; memória: maior é pior
+    for metrica, sentido in (("mb_s", -1), ("bytes_por_token", 1)):
+      if metrica not in agora or metrica not in antes:
+        continue
+      variacao = agora[metrica] / antes[metrica] - 1
+      piorou = sentido * variacao > limite
+      regrediu |= piorou
+      linhas.append((nome, tamanho, metrica, antes[metrica], agora[metrica], variacao,
+                     "REGRESSÃO" if piorou else "ok"))
+  return linhas, regrediu
+
+# troca o resultado do mesmo cenário pela nova medição, se ela for mais rápida
+def _fica_com_melhor(relatorio: Dict, novo: Dict):
+  resultados = relatorio["resultados"]
+  for k, resultado in enumerate(resultados):
+    if _chave(resultado) == _chave(novo) and novo["mb_s"] > resultado["mb_s"]:
+      resultados[k] = novo
+
+def _tabela(linhas: List[Tuple], atual: Dict) -> str:
+  ruido = {_chave(r): _resumo(r)["iqr_relativa"] for r in atual["resultados"]}
+  medianas = {_chave(r): _resumo(r)["mb_s_mediana"] for r in atual["resultados"]}
+  saida = [f"{'cenário':<9} {'tamanho':>7}  {'métrica':<15} {'base':>10} {'atual':>10} {'mediana':>8} {'IQR':>6} "
+           f"{'variação':>9}  situação"]
+  for nome, tamanho, metrica, antes, agora, variacao, situacao in linhas:
+    if metrica == "mb_s":
+      iqr = f"{medianas[(nome, tamanho)]:8.2f} {ruido[(nome, tamanho)]:6.1%}"
+    else:
+      iqr = " " * 15
+    antes_txt = f"{antes:10.2f}" if antes is not None else f"{'-':>10}"
+    variacao_txt = f"{variacao:+9.1%}" if variacao is not None else f"{'-':>9}"
+    saida.append(f"{nome:<9} {formata_tamanho(tamanho):>7}  {metrica:<15} {antes_txt} {agora:10.2f} {iqr} {variacao_txt}  {situacao}")
+  return "\n".join(saida)
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Compara o desempenho do Scanner com a baseline versionada.")
+  parser.add_argument("--baseline", default=BASELINE_PADRAO)
+  parser.add_argument("--atualizar", action="store_true", help="grava os resultados atuais como nova baseline")
+  parser.add_argument("--limite", type=float, default=LIMITE_PADRAO,
+                      help=f"piora tolerada, em fração (padrão: {LIMITE_PADRAO})")
+  parser.add_argument("--tamanhos", default=None, help=f"padrão: os da baseline, ou {TAMANHOS_PADRAO}")
+  parser.add_argument("--cenarios", default=",".join(ENGINES))
+  parser.add_argument("--repeticoes", type=int, default=7)
+  parser.add_argument("--aquecimento", type=int, default=2)
+  parser.add_argument("--confirmacoes", type=int, default=2,
+                      help="novas medições de um cenário que regrediu antes de falhar (padrão: 2)")
+  args = parser.parse_args(argv)
+
+  base = None
+  if not args.atualizar:
+    try:
+      with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    except FileNotFoundError:
+      print(f"baseline não encontrada: {args.baseline} (gere com --atualizar)", file=sys.stderr)
+      return 2
+  if args.tamanhos:
+    tamanhos = [le_tamanho(t) for t in args.tamanhos.split(",")]
+  elif base is not None:
+    tamanhos = sorted({r["bytes"] for r in base["resultados"]})
+  else:
+    tamanhos = [le_tamanho(t) for t in TAMANHOS_PADRAO.split(",")]
+  proporcoes = base["parametros"]["proporcoes"] if base is not None else None
+  seed = base["parametros"]["seed"] if base is not None else 0
+
+  atual = executa(tamanhos, args.cenarios.split(","), proporcoes, args.repeticoes, args.aquecimento,
+                  memoria_ate=max(tamanhos), seed=seed)
+  if args.atualizar:
+    with open(args.baseline, "w", encoding="utf-8") as f:
+      f.write(json.dumps(atual, indent=2, ensure_ascii=False) + "\n")
+    print(f"baseline gravada em {args.baseline}")
+    return 0
+
+  linhas, regrediu = compara(atual, base, args.limite)
+  for _ in range(args.confirmacoes):
+    if not regrediu:
+      break
+    suspeitos = {(nome, tamanho) for nome, tamanho, *_, situacao in linhas if situacao == "REGRESSÃO"}
+    for nome, tamanho in sorted(suspeitos):
+      novo = executa([tamanho], [nome], proporcoes, args.repeticoes, args.aquecimento,
+                     memoria_ate=tamanho, seed=seed)["resultados"][0]
+      _fica_com_melhor(atual, novo)
+    linhas, regrediu = compara(atual, base, args.limite)
+  print(_tabela(linhas, atual))
+  if regrediu:
+    print(f"\nregressão acima de {args.limite:.0%} em relação à baseline", file=sys.stderr)
+    return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
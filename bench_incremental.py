@@ -0,0 +1,75 @@
+# Benchmark da re-análise incremental - Compiladores
+# simula digitação num editor: em arquivos sintéticos de tamanhos crescentes, digita
+# e apaga caracteres no meio do arquivo e mede a latência de cada tecla: a edição
+# (IncrementalScanner.edit) mais a leitura dos tokens que ela mudou (janela), o que um
+# editor faz a cada tecla; com o custo proporcional à edição, a latência fica estável
+# quando o arquivo cresce
+#
+#   python bench_incremental.py --tamanhos 64K,1M,4M --teclas 200
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from bench_lexer import formata_tamanho, gera_fonte, le_tamanho
+from lexer_manual import ENGINES, IncrementalScanner
+
+TAMANHOS_PADRAO = "64K,512K,4M"
+
+# latências (segundos) de `teclas` edições seguidas da leitura dos tokens alterados:
+# metade digita "x" a partir de um espaço no meio do arquivo, a outra metade apaga o
+# que foi digitado
+def mede_teclas(inc: IncrementalScanner, pos: int, teclas: int) -> List[float]:
+  edicoes = [(pos + k, pos + k, "x") for k in range(teclas // 2)]
+  edicoes += [(pos + k, pos + k + 1, "") for k in reversed(range(teclas // 2))]
+  tempos = []
+  relogio = time.perf_counter
+  for inicio, fim, texto in edicoes:
+    t0 = relogio()
+    primeiro, _, inseridos = inc.edit(inicio, fim, texto)
+    inc.janela(primeiro, primeiro + inseridos)
+    tempos.append(relogio() - t0)
+  return tempos
+
+def executa(tamanhos: List[int], engines: Optional[List[str]] = None, teclas: int = 200) -> Dict:
+  resultados = []
+  for tamanho in tamanhos:
+    fonte = gera_fonte(tamanho)
+    pos = fonte.index(" ", len(fonte) // 2) + 1
+    for engine in engines or ["manual"]:
+      inc = IncrementalScanner(fonte, engine=engine)
+      gc.collect()
+      tempos = sorted(mede_teclas(inc, pos, teclas))
+      resultados.append({
+        "engine": engine,
+        "bytes": len(fonte),
+        "tokens": len(inc),
+        "mediana": statistics.median(tempos),
+        "p95": tempos[int(len(tempos) * 0.95) - 1],
+        "maximo": tempos[-1],
+      })
+  return {"resultados": resultados}
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Mede a latência por tecla (edição e leitura) do IncrementalScanner.")
+  parser.add_argument("--tamanhos", default=TAMANHOS_PADRAO)
+  parser.add_argument("--engines", default="manual", help=f"opções: {', '.join(ENGINES)}")
+  parser.add_argument("--teclas", type=int, default=200)
+  parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+  args = parser.parse_args(argv)
+  relatorio = executa([le_tamanho(t) for t in args.tamanhos.split(",")], args.engines.split(","), args.teclas)
+  if args.json:
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0
+  print(f"{'engine':<7} {'tamanho':>7} {'tokens':>8} {'mediana':>10} {'p95':>10} {'máximo':>10}")
+  for r in relatorio["resultados"]:
+    print(f"{r['engine']:<7} {formata_tamanho(r['bytes']):>7} {r['tokens']:>8} {r['mediana'] * 1e6:8.1f}us "
+          f"{r['p95'] * 1e6:8.1f}us {r['maximo'] * 1e6:8.1f}us")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,303 @@
+# Benchmarks do analisador léxico - Compiladores
+# gera código sintético semelhante a C (com proporções configuráveis de cada tipo de
+# token) e mede vazão (MB/s, tokens/s), pico de memória e alocações por token dos
+# engines do Scanner e dos scanners de exemplos_do_professor; resultados em JSON
+#
+#   python bench_lexer.py --tamanhos 1K,1M,64M --saida resultados.json
+#
+# entradas grandes: a fonte é um bloco aleatório de até 1 MB repetido até o tamanho
+# pedido. Até --memoria-ate os cenários guardam a lista de tokens (scan_all, cerca de
+# 100 bytes por token) e a memória é medida; acima disso os engines do Scanner só
+# contam os tokens de iter_tokens, sem guardá-los, e a memória fica na da fonte. Os
+# exemplos do professor não têm análise sob demanda e guardam a lista em qualquer
+# tamanho; para 1 GB use poucas repetições e limite os cenários (--cenarios manual)
+
+import argparse
+import datetime
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sized, Tuple, Union
+
+from lexer_manual import DELIMS, ENGINES, KEYWORDS, OPERATORS_1, OPERATORS_2PLUS, Scanner
+
+PROPORCOES_PADRAO = {
+  "id": 30,
+  "keyword": 10,
+  "num": 10,
+  "float": 3,
+  "operador": 20,
+  "delimitador": 20,
+  "string": 3,
+  "comentario": 2,
+  "diretiva": 2,
+}
+TAMANHOS_PADRAO = "1K,64K,1M"
+BLOCO_MAXIMO = 1 << 20  # tamanho do bloco aleatório repetido nas entradas grandes
+PASTA_EXEMPLOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exemplos_do_professor")
+
+# =========================
+# GERADOR DE CÓDIGO
+# =========================
+def _gera_bloco(tamanho: int, proporcoes: Dict[str, int], rnd: random.Random) -> str:
+  letras = "abcdefghijklmnopqrstuvwxyz_"
+  nomes = ["".join(rnd.choice(letras) for _ in range(rnd.randint(1, 12))) for _ in range(500)]
+  nomes = [n for n in nomes if n not in KEYWORDS] or ["x"]
+  palavras = sorted(KEYWORDS)
+  operadores = sorted(OPERATORS_2PLUS) + sorted(OPERATORS_1)
+  delimitadores = sorted(DELIMS)
+  geradores = {
+    "id": lambda: rnd.choice(nomes),
+    "keyword": lambda: rnd.choice(palavras),
+    "num": lambda: str(rnd.randint(0, 99999)),
+    "float": lambda: f"{rnd.random() * 1000:.3f}",
+    "operador": lambda: rnd.choice(operadores),
+    "delimitador": lambda: rnd.choice(delimitadores),
+    "string": lambda: '"' + " ".join(rnd.choices(nomes, k=rnd.randint(1, 6))) + '\\n"',
+    "comentario": lambda: (f"// {' '.join(rnd.choices(nomes, k=5))}\n" if rnd.random() < 0.5
+                           else f"/* {' '.join(rnd.choices(nomes, k=8))} */"),
+    "diretiva": lambda: f"\n#include <{rnd.choice(nomes)}.h>\n",
+  }
+  tipos = [t for t, peso in proporcoes.items() if peso > 0]
+  pesos = [proporcoes[t] for t in tipos]
+  partes: List[str] = []
+  total = 0
+  while total < tamanho:
+    linha = "  " + " ".join(geradores[t]() for t in rnd.choices(tipos, pesos, k=12)) + "\n"
+    partes.append(linha)
+    total += len(linha)
+  return _corta("".join(partes), tamanho)
+
+# corta no fim de uma linha (sem deixar literal ou comentário pela metade) e
+# completa com espaços até o tamanho exato
+def _corta(texto: str, tamanho: int) -> str:
+  fim = texto.rfind("\n", 0, tamanho) + 1
+  return texto[:fim] + " " * (tamanho - fim)
+
+# código sintético de `tamanho` caracteres (ASCII) com a mistura de tokens dada pelas
+# proporções (pesos relativos por categoria de PROPORCOES_PADRAO); determinístico por seed
+def gera_fonte(tamanho: int, proporcoes: Optional[Dict[str, int]] = None, seed: int = 0) -> str:
+  proporcoes = {**PROPORCOES_PADRAO, **(proporcoes or {})}
+  desconhecidas = set(proporcoes) - set(PROPORCOES_PADRAO)
+  if desconhecidas:
+    raise ValueError(f"categorias desconhecidas: {', '.join(sorted(desconhecidas))}")
+  bloco = _gera_bloco(min(tamanho, BLOCO_MAXIMO), proporcoes, random.Random(seed))
+  if len(bloco) >= tamanho:
+    return bloco
+  # join aloca a fonte uma única vez: sem a cópia intermediária de bloco * n
+  repeticoes, resto = divmod(tamanho, len(bloco))
+  return "".join([bloco] * repeticoes + [_corta(bloco, resto)])
+
+# =========================
+# CENÁRIOS
+# =========================
+# carrega um exemplo do professor como módulo; None se faltar alguma dependência (ex.: ply)
+def _carrega_exemplo(nome: str):
+  spec = importlib.util.spec_from_file_location(f"_bench_{nome}", os.path.join(PASTA_EXEMPLOS, nome + ".py"))
+  modulo = importlib.util.module_from_spec(spec)
+  try:
+    spec.loader.exec_module(modulo)
+  except ImportError:
+    return None
+  return modulo
+
+# cenário: função que analisa a fonte e devolve os tokens (mantidos vivos para medir memória)
+# retorna os cenários disponíveis e, para os indisponíveis, o motivo
+def cenarios() -> Tuple[Dict[str, Callable[[str], Sized]], Dict[str, str]]:
+  disponiveis: Dict[str, Callable[[str], Sized]] = {}
+  for engine in ENGINES:
+    disponiveis[engine] = lambda fonte, engine=engine: Scanner(fonte, engine=engine).scan_all()
+  ignorados = {}
+  ex1 = _carrega_exemplo("exemplo1")
+  disponiveis["exemplo1"] = lambda fonte: ex1.Scanner(fonte).scan_all()
+  ex2 = _carrega_exemplo("exemplo2")
+  disponiveis["exemplo2"] = lambda fonte: ex2.ScannerAFD(fonte).scan_all()
+  ex3 = _carrega_exemplo("exemplo3")
+  if ex3 is None:
+    ignorados["exemplo3"] = "ply não instalado"
+  else:
+    disponiveis["exemplo3"] = lambda fonte: ex3.scan_with_symbols(fonte)[0]
+  return disponiveis, ignorados
+
+# cenários que só contam os tokens, sem guardá-los (entradas acima de memoria_ate)
+def contadores() -> Dict[str, Callable[[str], int]]:
+  return {engine: lambda fonte, engine=engine: _conta(Scanner(fonte, engine=engine).iter_tokens())
+          for engine in ENGINES}
+
+def _conta(tokens) -> int:
+  n = 0
+  for _ in tokens:
+    n += 1
+  return n
+
+# =========================
+# MEDIÇÃO
+# =========================
+# tempos (segundos) de `repeticoes` execuções, após `aquecimento` execuções descartadas;
+# a função devolve os tokens ou só quantos foram
+def mede_tempo(funcao: Callable[[str], Union[Sized, int]], fonte: str, repeticoes: int = 3,
+               aquecimento: int = 1) -> Tuple[List[float], int]:
+  n = 0
+  for _ in range(aquecimento):
+    n = _quantos(funcao(fonte))
+  tempos = []
+  for _ in range(repeticoes):
+    gc.collect()
+    t0 = time.perf_counter()
+    resultado = funcao(fonte)
+    tempos.append(time.perf_counter() - t0)
+    n = _quantos(resultado)
+    del resultado
+  return tempos, n
+
+def _quantos(resultado: Union[Sized, int]) -> int:
+  return resultado if isinstance(resultado, int) else len(resultado)
+
+# memória de uma execução: pico (tracemalloc) e blocos que continuam alocados no fim
+# (objetos retidos pelos tokens), ambos a partir do estado antes da análise
+def mede_memoria(funcao: Callable[[str], Sized], fonte: str) -> Dict[str, float]:
+  gc.collect()
+  blocos = sys.getallocatedblocks()
+  resultado = funcao(fonte)
+  blocos = sys.getallocatedblocks() - blocos
+  n = len(resultado)
+  del resultado
+  gc.collect()
+  tracemalloc.start()
+  resultado = funcao(fonte)
+  pico = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+  del resultado
+  return {
+    "pico_bytes": pico,
+    "bytes_por_token": pico / n,
+    "blocos_por_token": blocos / n,
+  }
+
+# distância interquartil (0 com menos de duas medidas)
+def iqr(valores: List[float]) -> float:
+  if len(valores) < 2:
+    return 0.0
+  q1, _, q3 = statistics.quantiles(valores, n=4, method="inclusive")
+  return q3 - q1
+
+# executa todos os cenários em todos os tamanhos; memória só até memoria_ate bytes
+# (tracemalloc deixa a análise várias vezes mais lenta). Acima disso os engines só
+# contam os tokens ("modo": "contagem"), para a lista não dominar a memória
+def executa(tamanhos: List[int], nomes: Optional[List[str]] = None, proporcoes: Optional[Dict[str, int]] = None,
+            repeticoes: int = 3, aquecimento: int = 1, memoria_ate: int = 4 << 20, seed: int = 0,
+            progresso: Optional[Callable[[str], None]] = None) -> Dict:
+  disponiveis, ignorados = cenarios()
+  so_contagem = contadores()
+  nomes = nomes or [*disponiveis, *ignorados]
+  for nome in nomes:
+    if nome not in disponiveis and nome not in ignorados:
+      raise ValueError(f"cenário desconhecido: {nome!r} (use um de {', '.join(disponiveis)})")
+  resultados = []
+  for tamanho in tamanhos:
+    fonte = gera_fonte(tamanho, proporcoes, seed)
+    for nome in nomes:
+      if nome in ignorados:
+        continue
+      lista = tamanho <= memoria_ate or nome not in so_contagem
+      funcao = disponiveis[nome] if lista else so_contagem[nome]
+      tempos, n = mede_tempo(funcao, fonte, repeticoes, aquecimento)
+      melhor = min(tempos)
+      resultado = {
+        "cenario": nome,
+        "bytes": tamanho,
+        "modo": "lista" if lista else "contagem",
+        "tokens": n,
+        "tempos": tempos,
+        "segundos": melhor,
+        "mediana": statistics.median(tempos),
+        "iqr": iqr(tempos),
+        "mb_s": tamanho / 1e6 / melhor,
+        "tokens_s": n / melhor,
+      }
+      if tamanho <= memoria_ate:
+        resultado.update(mede_memoria(disponiveis[nome], fonte))
+      resultados.append(resultado)
+      if progresso:
+        progresso(f"{nome:<9} {formata_tamanho(tamanho):>6}  {resultado['mb_s']:8.2f} MB/s  "
+                  f"{resultado['tokens_s']:12,.0f} tokens/s")
+  return {
+    "versao": 1,
+    "data": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    "python": platform.python_version(),
+    "implementacao": platform.python_implementation(),
+    "plataforma": platform.platform(),
+    "parametros": {
+      "proporcoes": {**PROPORCOES_PADRAO, **(proporcoes or {})},
+      "repeticoes": repeticoes,
+      "aquecimento": aquecimento,
+      "seed": seed,
+    },
+    "ignorados": {nome: motivo for nome, motivo in ignorados.items() if nome in nomes},
+    "resultados": resultados,
+  }
+
+# =========================
+# LINHA DE COMANDO
+# =========================
+_UNIDADES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+# "64K" → 65536
+def le_tamanho(texto: str) -> int:
+  texto = texto.strip().upper().removesuffix("B")
+  unidade = texto[-1:] if texto[-1:] in _UNIDADES else ""
+  return int(texto[:len(texto) - len(unidade)]) * _UNIDADES[unidade]
+
+def formata_tamanho(n: int) -> str:
+  for unidade in ("G", "M", "K"):
+    if n >= _UNIDADES[unidade] and n % _UNIDADES[unidade] == 0:
+      return f"{n // _UNIDADES[unidade]}{unidade}"
+  return str(n)
+
+# "id=40,string=0" → {"id": 40, "string": 0}
+def _le_proporcoes(texto: str) -> Dict[str, int]:
+  proporcoes = {}
+  for item in filter(None, texto.split(",")):
+    nome, _, peso = item.partition("=")
+    proporcoes[nome.strip()] = int(peso)
+  return proporcoes
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Benchmarks do analisador léxico.")
+  parser.add_argument("--tamanhos", default=TAMANHOS_PADRAO, help=f"tamanhos da entrada (padrão: {TAMANHOS_PADRAO})")
+  parser.add_argument("--cenarios", default="", help="cenários separados por vírgula (padrão: todos)")
+  parser.add_argument("--proporcoes", default="",
+                      help="pesos por categoria, ex.: id=40,string=0 (categorias: " + ", ".join(PROPORCOES_PADRAO) + ")")
+  parser.add_argument("--repeticoes", type=int, default=3)
+  parser.add_argument("--aquecimento", type=int, default=1)
+  parser.add_argument("--memoria-ate", default="4M", help="mede memória só até este tamanho (padrão: 4M)")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--saida", help="arquivo JSON de resultados (padrão: saída padrão)")
+  args = parser.parse_args(argv)
+
+  relatorio = executa(
+    [le_tamanho(t) for t in args.tamanhos.split(",")],
+    [c.strip() for c in args.cenarios.split(",") if c.strip()] or None,
+    _le_proporcoes(args.proporcoes),
+    args.repeticoes, args.aquecimento, le_tamanho(args.memoria_ate), args.seed,
+    progresso=lambda linha: print(linha, file=sys.stderr),
+  )
+  for nome, motivo in relatorio["ignorados"].items():
+    print(f"{nome}: ignorado ({motivo})", file=sys.stderr)
+  texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+  if args.saida:
+    with open(args.saida, "w", encoding="utf-8") as f:
+      f.write(texto + "\n")
+  else:
+    print(texto)
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,71 @@
+# Benchmark de tokens longos - Compiladores
+# mede a vazão dos engines do Scanner em entradas dominadas por um único tipo de
+# construção longa: literais de string de vários MB, blocos de comentário extensos,
+# cabeçalhos de licença com comentários de linha e diretivas compridas
+#
+#   python bench_longos.py --tamanho 1M --casos string,comentario_bloco
+
+import argparse
+import json
+import sys
+from typing import Callable, Dict, List, Optional
+
+from bench_lexer import formata_tamanho, le_tamanho, mede_tempo
+from lexer_manual import ENGINES, Scanner
+
+def _repete(trecho: str, tamanho: int) -> str:
+  return (trecho * (tamanho // len(trecho) + 1))[:tamanho]
+
+# cada caso gera uma entrada de (aproximadamente) `tamanho` caracteres
+CASOS: Dict[str, Callable[[int], str]] = {
+  # um único literal com texto comum, escapes e quebras de linha
+  "string": lambda n: '"' + _repete('texto comum \\"entre aspas\\" e \\\\barras\\n ', n - 3) + '";',
+  "string_linhas": lambda n: '"' + _repete("linha de um literal longo\n", n - 3) + '";',
+  # um único comentário de bloco, com '*' soltos no meio
+  "comentario_bloco": lambda n: "/*" + _repete(" * Licença: texto longo do cabeçalho ** \n", n - 7) + "*/ x;",
+  # cabeçalho de licença feito de comentários de linha
+  "comentario_linhas": lambda n: _repete("// Copyright (c) Compiladores - todos os direitos reservados\n", n - 2) + "x;",
+  # uma diretiva de uma linha só (ex.: tabela gerada em #define)
+  "diretiva": lambda n: "#define TABELA " + _repete("0x1f, 0x2e, 0x3d, ", n - 18) + "\nx;",
+}
+
+def executa(tamanho: int, casos: Optional[List[str]] = None, engines: Optional[List[str]] = None,
+            repeticoes: int = 5, aquecimento: int = 1) -> Dict:
+  resultados = []
+  for caso in casos or list(CASOS):
+    fonte = CASOS[caso](tamanho)
+    for engine in engines or list(ENGINES):
+      tempos, n = mede_tempo(lambda f, engine=engine: Scanner(f, engine=engine).scan_all(), fonte,
+                             repeticoes, aquecimento)
+      resultados.append({
+        "caso": caso,
+        "engine": engine,
+        "bytes": len(fonte),
+        "tokens": n,
+        "segundos": min(tempos),
+        "mb_s": len(fonte) / 1e6 / min(tempos),
+      })
+  return {"resultados": resultados}
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Mede o Scanner em entradas com tokens e comentários longos.")
+  parser.add_argument("--tamanho", default="1M")
+  parser.add_argument("--casos", default=",".join(CASOS))
+  parser.add_argument("--engines", default=",".join(ENGINES))
+  parser.add_argument("--repeticoes", type=int, default=5)
+  parser.add_argument("--aquecimento", type=int, default=1)
+  parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+  args = parser.parse_args(argv)
+  relatorio = executa(le_tamanho(args.tamanho), args.casos.split(","), args.engines.split(","),
+                      args.repeticoes, args.aquecimento)
+  if args.json:
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0
+  print(f"{'caso':<18} {'engine':<7} {'tamanho':>7} {'tokens':>7} {'tempo':>10} {'MB/s':>8}")
+  for r in relatorio["resultados"]:
+    print(f"{r['caso']:<18} {r['engine']:<7} {formata_tamanho(r['bytes']):>7} {r['tokens']:>7} "
+          f"{r['segundos'] * 1e3:8.2f}ms {r['mb_s']:8.2f}")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,102 @@
+# Microbenchmark da classificação de palavras - Compiladores
+# compara a consulta única do Scanner (palavras-chave e símbolos na mesma tabela,
+# Scanner._palavras) com o caminho antigo em dois passos (palavras-chave e depois a
+# tabela de símbolos), em código com muitos identificadores (bench_lexer.gera_fonte).
+# as medições dos dois lados são intercaladas e vale a melhor de cada um
+#
+#   python bench_palavras.py --tamanho 1M --repeticoes 15 --engines manual,regex,afd
+
+import argparse
+import json
+import re
+import statistics
+import sys
+from typing import Dict, List, Mapping, Optional
+
+from bench_lexer import formata_tamanho, gera_fonte, le_tamanho, mede_tempo
+from lexer_manual import _KEYWORDS_LEXEMA, _LEXEMAS_ID, Scanner, SymbolTable, Token, TokenType, _estende_lexemas_id
+
+# muitos identificadores e palavras-chave, pouca pontuação
+PROPORCOES_PALAVRAS = {"id": 60, "keyword": 20, "operador": 10, "delimitador": 10}
+
+# o caminho antigo, para comparação: a tabela de consulta só tem as palavras-chave e
+# um identificador é procurado de novo na tabela de símbolos
+class ScannerDoisPassos(Scanner):
+  @Scanner.symbols.setter
+  def symbols(self, tabela: Mapping[str, Mapping[str, int]]):
+    self._symbols = tabela if isinstance(tabela, SymbolTable) else SymbolTable(tabela)
+    self._palavras = _KEYWORDS_LEXEMA
+    _estende_lexemas_id(self._symbols.next_id)
+
+  def _emit_id(self, name: str, entrada: Optional[int]) -> Token:
+    entrada = self._symbols._posicao.get(name)
+    if entrada is None:
+      return Token(TokenType.ID, _LEXEMAS_ID[self._symbols._primeira_ocorrencia(name)])
+    return Token(TokenType.ID, _LEXEMAS_ID[self._symbols._ocorrencia(entrada)])
+
+# só a etapa de classificação (o mesmo código dos engines), sobre os lexemas já recortados
+def _classifica(classe):
+  def funcao(palavras: List[str]) -> list:
+    sc = classe("")
+    tokens = []
+    for lex in palavras:
+      entrada = sc._palavras.get(lex)
+      if entrada.__class__ is str:
+        tokens.append(Token(TokenType.KEYWORD, entrada))
+      else:
+        tokens.append(sc._emit_id(lex, entrada))
+    return tokens
+  return funcao
+
+# a análise completa (scan_all), com a classificação de cada scanner
+def _analisa(classe, engine: str):
+  return lambda fonte: classe(fonte, engine=engine).scan_all()
+
+def executa(tamanho: int, repeticoes: int = 15, aquecimento: int = 1, seed: int = 0,
+            engines: Optional[List[str]] = None) -> Dict:
+  fonte = gera_fonte(tamanho, PROPORCOES_PALAVRAS, seed)
+  palavras = re.findall(r"[A-Za-z_][A-Za-z0-9_]*", fonte)
+  casos = {"classificacao": (palavras, _classifica(ScannerDoisPassos), _classifica(Scanner))}
+  for engine in engines or ["manual"]:
+    casos[f"scan_all/{engine}"] = (fonte, _analisa(ScannerDoisPassos, engine), _analisa(Scanner, engine))
+  resultados = []
+  for nome, (entrada, antigo, novo) in casos.items():
+    # alterna as medições para que a interferência de fundo atinja os dois igualmente
+    mede_tempo(antigo, entrada, 0, aquecimento)
+    mede_tempo(novo, entrada, 0, aquecimento)
+    t_antigo, t_novo = [], []
+    for _ in range(repeticoes):
+      t_antigo += mede_tempo(antigo, entrada, 1, 0)[0]
+      t_novo += mede_tempo(novo, entrada, 1, 0)[0]
+    resultados.append({
+      "caso": nome,
+      "dois_passos_s": min(t_antigo),
+      "consulta_unica_s": min(t_novo),
+      "dois_passos_mediana_s": statistics.median(t_antigo),
+      "consulta_unica_mediana_s": statistics.median(t_novo),
+      "ganho": min(t_antigo) / min(t_novo) - 1,
+    })
+  return {"bytes": tamanho, "palavras": len(palavras), "resultados": resultados}
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Compara a classificação de palavras em uma e em duas consultas.")
+  parser.add_argument("--tamanho", default="1M")
+  parser.add_argument("--repeticoes", type=int, default=15)
+  parser.add_argument("--aquecimento", type=int, default=1)
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--engines", default="manual", help="engines para a análise completa (separados por vírgula)")
+  parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+  args = parser.parse_args(argv)
+  relatorio = executa(le_tamanho(args.tamanho), args.repeticoes, args.aquecimento, args.seed,
+                      args.engines.split(","))
+  if args.json:
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0
+  print(f"{formata_tamanho(relatorio['bytes'])} de código, {relatorio['palavras']} palavras")
+  print(f"{'caso':<18} {'dois passos':>12} {'consulta única':>15} {'ganho':>8}")
+  for r in relatorio["resultados"]:
+    print(f"{r['caso']:<18} {r['dois_passos_s'] * 1e3:10.2f}ms {r['consulta_unica_s'] * 1e3:13.2f}ms {r['ganho']:+8.1%}")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
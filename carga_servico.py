@@ -0,0 +1,107 @@
+# Teste de carga do serviço de análise léxica - Compiladores
+# abre várias conexões com o serviço (lexer_servico) e envia requisições simultâneas
+# de código sintético (bench_lexer.gera_fonte), medindo vazão e latência
+#
+#   python lexer_servico.py --porta 7878 &
+#   python carga_servico.py --porta 7878 --conexoes 8 --concorrencia 16 --requisicoes 5000
+#   python carga_servico.py --iniciar     # sobe um servidor local só para o teste
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from bench_lexer import gera_fonte, le_tamanho
+from lexer_cliente import AsyncLexerClient, Endereco
+from lexer_servico import PORTA_PADRAO, LexerServer
+
+def _percentil(ordenados: List[float], p: float) -> float:
+  return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+# executa a carga e devolve o resumo (vazão e latências em milissegundos)
+async def carga(endereco: Endereco, conexoes: int = 4, concorrencia: int = 8, requisicoes: int = 1000,
+                tamanho: int = 1024, tamanho_grande: int = 256 << 10, fracao_grandes: float = 0.0,
+                engine: str = "manual") -> Dict:
+  pequena = gera_fonte(tamanho, seed=1)
+  grande = gera_fonte(tamanho_grande, seed=2) if fracao_grandes > 0 else pequena
+  a_cada = round(1 / fracao_grandes) if fracao_grandes > 0 else 0  # uma grande a cada N
+  clientes = [await AsyncLexerClient.connect(endereco) for _ in range(conexoes)]
+  latencias: List[float] = []
+  enviados = 0
+  bytes_enviados = 0
+  erros = 0
+
+  async def trabalhador(cliente: AsyncLexerClient):
+    nonlocal enviados, bytes_enviados, erros
+    while enviados < requisicoes:
+      enviados += 1
+      codigo = grande if a_cada and enviados % a_cada == 0 else pequena
+      bytes_enviados += len(codigo)
+      t0 = time.perf_counter()
+      try:
+        await cliente.scan(codigo, engine)
+      except Exception:
+        erros += 1
+        continue
+      latencias.append(time.perf_counter() - t0)
+
+  inicio = time.perf_counter()
+  await asyncio.gather(*(trabalhador(c) for c in clientes for _ in range(concorrencia)))
+  duracao = time.perf_counter() - inicio
+  for cliente in clientes:
+    await cliente.close()
+  ordenadas = sorted(latencias) or [0.0]
+  return {
+    "requisicoes": len(latencias),
+    "erros": erros,
+    "segundos": duracao,
+    "requisicoes_s": len(latencias) / duracao,
+    "mb_s": bytes_enviados / 1e6 / duracao,
+    "latencia_ms": {
+      "media": statistics.fmean(ordenadas) * 1e3,
+      "p50": _percentil(ordenadas, 0.50) * 1e3,
+      "p90": _percentil(ordenadas, 0.90) * 1e3,
+      "p99": _percentil(ordenadas, 0.99) * 1e3,
+      "max": ordenadas[-1] * 1e3,
+    },
+  }
+
+async def _executa(args) -> Dict:
+  servidor = None
+  if args.iniciar:
+    servidor = LexerServer(args.workers)
+    await servidor.start(args.host, 0)
+    endereco = servidor.enderecos[0][:2]
+  else:
+    endereco = args.unix or (args.host, args.porta)
+  try:
+    return await carga(endereco, args.conexoes, args.concorrencia, args.requisicoes, le_tamanho(args.tamanho),
+                       le_tamanho(args.tamanho_grande), args.grandes, args.engine)
+  finally:
+    if servidor is not None:
+      await servidor.close()
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Teste de carga do serviço de análise léxica.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+  parser.add_argument("--unix", help="caminho de socket Unix do serviço")
+  parser.add_argument("--iniciar", action="store_true", help="sobe um servidor local para o teste")
+  parser.add_argument("--workers", type=int, default=None, help="processos do servidor local (--iniciar)")
+  parser.add_argument("--conexoes", type=int, default=4)
+  parser.add_argument("--concorrencia", type=int, default=8, help="requisições simultâneas por conexão")
+  parser.add_argument("--requisicoes", type=int, default=1000)
+  parser.add_argument("--tamanho", default="1K", help="tamanho do código de cada requisição")
+  parser.add_argument("--grandes", type=float, default=0.0, help="fração de requisições grandes")
+  parser.add_argument("--tamanho-grande", default="256K")
+  parser.add_argument("--engine", default="manual")
+  args = parser.parse_args(argv)
+  resumo = asyncio.run(_executa(args))
+  print(json.dumps(resumo, indent=2, ensure_ascii=False))
+  return 1 if resumo["erros"] else 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,313 @@
+# Formato binário de tokens - Compiladores
+# serializa a saída de scan_all (tokens + tabela de símbolos) para passar entre
+# processos/etapas sem analisar de novo nem usar pickle
+#
+# layout (versão 1), inteiros em varint (LEB128 sem sinal):
+#   cabeçalho: b"LXTK" + versão (1 byte)
+#   um registro por token: tipo (TokenType.value), delta do início em relação ao
+#     token anterior (zigzag) e referência ao lexema: 0 = lexema novo, seguido de
+#     tamanho + bytes UTF-8 (entra na tabela com o próximo número); k = k-ésimo lexema
+#   marcador de fim: tipo 0
+#   rodapé: nº de tokens, nº de lexemas, nº de blocos, preenchimento até múltiplo de 8,
+#     posições das definições de lexemas (u64), índice de blocos (u64 posição, u64 início
+#     anterior em zigzag, a cada BLOCO tokens) e tabela de símbolos (nº, e por id:
+#     tamanho + nome, id, contagem)
+#   final: posição do rodapé (u64) + b"LXTK"
+# os u64 são little-endian; o índice permite ler o token i sem decodificar o arquivo todo
+
+import mmap as _mmap
+import os
+import struct
+import sys
+from array import array
+from typing import IO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from lexer_manual import SymbolTable, Token, TokenType
+
+MAGICO = b"LXTK"
+VERSAO = 1
+BLOCO = 64  # tokens por entrada do índice de blocos
+
+TabelaSimbolos = Mapping[str, Mapping[str, int]]  # SymbolTable ou dict {nome: {"id", "count"}}
+_FINAL = struct.Struct("<Q4s")
+_TIPOS = {tipo.value: tipo for tipo in TokenType}
+
+def _varint(buf: bytearray, n: int):
+  while n > 0x7F:
+    buf.append((n & 0x7F) | 0x80)
+    n >>= 7
+  buf.append(n)
+
+# lê um varint em dados[pos:], devolvendo (valor, próxima posição)
+def _le_varint(dados, pos: int) -> Tuple[int, int]:
+  b = dados[pos]
+  if b < 0x80:
+    return b, pos + 1
+  n = b & 0x7F
+  desloc = 7
+  while True:
+    pos += 1
+    b = dados[pos]
+    n |= (b & 0x7F) << desloc
+    if b < 0x80:
+      return n, pos + 1
+    desloc += 7
+
+# inteiros com sinal em varint: 0, -1, 1, -2, ... → 0, 1, 2, 3, ...
+def _zigzag(n: int) -> int:
+  return n << 1 if n >= 0 else (-n << 1) - 1
+
+def _unzigzag(n: int) -> int:
+  return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+def _u64(valores: array) -> bytes:
+  if sys.byteorder == "big":
+    valores = array("Q", valores)
+    valores.byteswap()
+  return valores.tobytes()
+
+def _simbolos_bytes(symbols: TabelaSimbolos) -> bytearray:
+  buf = bytearray()
+  if not isinstance(symbols, SymbolTable):
+    symbols = SymbolTable(symbols)
+  _varint(buf, len(symbols))
+  for nome, sym_id, count in sorted(symbols.entries(), key=lambda e: e[1]):
+    nome_b = nome.encode("utf-8", "surrogatepass")
+    _varint(buf, len(nome_b))
+    buf += nome_b
+    _varint(buf, sym_id)
+    _varint(buf, count)
+  return buf
+
+def _le_simbolos(dados, pos: int) -> SymbolTable:
+  symbols = SymbolTable()
+  n, pos = _le_varint(dados, pos)
+  for _ in range(n):
+    tam, pos = _le_varint(dados, pos)
+    nome = bytes(dados[pos:pos + tam]).decode("utf-8", "surrogatepass")
+    sym_id, pos = _le_varint(dados, pos + tam)
+    count, pos = _le_varint(dados, pos)
+    symbols.add(nome, count, sym_id)
+  return symbols
+
+# =========================
+# ESCRITA
+# =========================
+# escreve tokens um a um num stream binário (pode ser um pipe: só usa write);
+# close grava o rodapé com a tabela de símbolos
+class TokenWriter:
+  def __init__(self, stream: IO[bytes]):
+    self.stream = stream
+    self._buf = bytearray(MAGICO)
+    self._buf.append(VERSAO)
+    self._enviados = 0   # bytes já passados ao stream
+    self._n = 0
+    self._anterior = 0   # início do token anterior
+    self._lexemas: Dict[str, int] = {}
+    self._definicoes = array("Q")  # posição da definição de cada lexema
+    self._blocos = array("Q")      # pares (posição, início anterior em zigzag)
+    self._fechado = False
+
+  def write(self, tok: Token):
+    buf = self._buf
+    if self._n % BLOCO == 0:
+      self._blocos.append(self._enviados + len(buf))
+      self._blocos.append(_zigzag(self._anterior))
+    _varint(buf, tok.tipo.value)
+    _varint(buf, _zigzag(tok.inicio - self._anterior))
+    self._anterior = tok.inicio
+    ref = self._lexemas.get(tok.lexema)
+    if ref is None:
+      self._lexemas[tok.lexema] = len(self._lexemas) + 1
+      buf.append(0)
+      self._definicoes.append(self._enviados + len(buf))
+      dados = tok.lexema.encode("utf-8", "surrogatepass")
+      _varint(buf, len(dados))
+      buf += dados
+    else:
+      _varint(buf, ref)
+    self._n += 1
+    if len(buf) >= 1 << 16:
+      self._descarrega()
+
+  def write_all(self, tokens: Iterable[Token]):
+    for tok in tokens:
+      self.write(tok)
+
+  def _descarrega(self):
+    self.stream.write(self._buf)
+    self._enviados += len(self._buf)
+    self._buf = bytearray()
+
+  # grava marcador de fim, rodapé e final; não fecha o stream
+  def close(self, symbols: TabelaSimbolos):
+    if self._fechado:
+      return
+    self._fechado = True
+    buf = self._buf
+    buf.append(0)
+    rodape = self._enviados + len(buf)
+    _varint(buf, self._n)
+    _varint(buf, len(self._definicoes))
+    _varint(buf, len(self._blocos) // 2)
+    buf += bytes(-(self._enviados + len(buf)) % 8)  # alinhamento dos u64
+    buf += _u64(self._definicoes)
+    buf += _u64(self._blocos)
+    buf += _simbolos_bytes(symbols)
+    buf += _FINAL.pack(rodape, MAGICO)
+    self._descarrega()
+
+# grava tokens e tabela de símbolos de uma vez
+def dump(tokens: Iterable[Token], symbols: TabelaSimbolos, stream: IO[bytes]):
+  escritor = TokenWriter(stream)
+  escritor.write_all(tokens)
+  escritor.close(symbols)
+
+# =========================
+# LEITURA SEQUENCIAL
+# =========================
+def _valida_cabecalho(cabecalho: bytes):
+  if cabecalho[:4] != MAGICO:
+    raise ValueError("não é um arquivo de tokens (assinatura inválida)")
+  if len(cabecalho) < 5 or cabecalho[4] != VERSAO:
+    raise ValueError(f"versão do formato não suportada: {cabecalho[4:5]!r}")
+
+# lê os tokens de um stream binário em ordem, sem precisar de seek;
+# a tabela de símbolos fica em .symbols depois de consumir todos os tokens
+class TokenReader:
+  def __init__(self, stream: IO[bytes], chunk_size: int = 1 << 16):
+    self.stream = stream
+    self.chunk_size = chunk_size
+    self.symbols: Optional[SymbolTable] = None
+    self._dados = stream.read(5)
+    _valida_cabecalho(self._dados)
+    self._pos = 5
+    self._base = 0  # posição de _dados[0] no arquivo
+
+  # garante n bytes disponíveis a partir de _pos (ou até o fim do stream)
+  def _garante(self, n: int):
+    falta = self._pos + n - len(self._dados)
+    if falta > 0:
+      self._base += self._pos
+      self._dados = self._dados[self._pos:] + self.stream.read(max(falta, self.chunk_size))
+      self._pos = 0
+
+  def __iter__(self) -> Iterator[Token]:
+    lexemas: List[str] = []
+    anterior = 0
+    while True:
+      self._garante(32)
+      dados = self._dados
+      valor, pos = _le_varint(dados, self._pos)
+      if valor == 0:
+        break
+      tipo = _TIPOS[valor]
+      delta, pos = _le_varint(dados, pos)
+      anterior += _unzigzag(delta)
+      ref, pos = _le_varint(dados, pos)
+      if ref == 0:
+        tam, pos = _le_varint(dados, pos)
+        self._pos = pos
+        self._garante(tam)
+        dados, pos = self._dados, self._pos
+        lexema = dados[pos:pos + tam].decode("utf-8", "surrogatepass")
+        lexemas.append(lexema)
+        pos += tam
+      else:
+        lexema = lexemas[ref - 1]
+      self._pos = pos
+      yield Token(tipo, lexema, anterior)
+    # rodapé: pula contagens, alinhamento e tabelas de posições até os símbolos
+    self._base += pos
+    dados = self._dados[pos:] + self.stream.read()
+    _, pos = _le_varint(dados, 0)
+    n_lexemas, pos = _le_varint(dados, pos)
+    n_blocos, pos = _le_varint(dados, pos)
+    pos += -(self._base + pos) % 8 + 8 * (n_lexemas + 2 * n_blocos)
+    self.symbols = _le_simbolos(dados, pos)
+
+# lê tokens e tabela de símbolos de uma vez
+def load(stream: IO[bytes]) -> Tuple[List[Token], SymbolTable]:
+  leitor = TokenReader(stream)
+  tokens = list(leitor)
+  return tokens, leitor.symbols
+# =========================
+# ACESSO ALEATÓRIO (mmap)
+# =========================
+# abre um arquivo de tokens mapeado em memória; tokens[i] decodifica só o bloco
+# que contém i (no máximo BLOCO registros), usando o índice gravado no rodapé
+class TokenFile:
+  def __init__(self, caminho: Union[str, "os.PathLike[str]"]):
+    with open(caminho, "rb") as f:
+      self._mm = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+    mm = self._mm
+    if len(mm) < 5 + _FINAL.size:
+      raise ValueError("arquivo de tokens truncado")
+    _valida_cabecalho(mm[:5])
+    rodape, magico = _FINAL.unpack(mm[-_FINAL.size:])
+    if magico != MAGICO:
+      raise ValueError("arquivo de tokens truncado")
+    self._n, pos = _le_varint(mm, rodape)
+    n_lexemas, pos = _le_varint(mm, pos)
+    n_blocos, pos = _le_varint(mm, pos)
+    pos += -pos % 8
+    self._mv = memoryview(mm)
+    self._definicoes = self._u64(pos, n_lexemas)
+    pos += 8 * n_lexemas
+    self._blocos = self._u64(pos, 2 * n_blocos)
+    self.symbols = _le_simbolos(mm, pos + 16 * n_blocos)
+
+  def _u64(self, pos: int, n: int):
+    if sys.byteorder == "big":
+      valores = array("Q", self._mv[pos:pos + 8 * n])
+      valores.byteswap()
+      return valores
+    return self._mv[pos:pos + 8 * n].cast("Q")  # sem cópia
+
+  def __len__(self) -> int:
+    return self._n
+
+  # k-ésimo lexema da tabela (1 = primeiro)
+  def _lexema(self, ref: int) -> str:
+    tam, pos = _le_varint(self._mm, self._definicoes[ref - 1])
+    return self._mm[pos:pos + tam].decode("utf-8", "surrogatepass")
+
+  def __getitem__(self, i: int) -> Token:
+    if i < 0:
+      i += self._n
+    if not 0 <= i < self._n:
+      raise IndexError("índice de token fora do intervalo")
+    bloco = i // BLOCO
+    mm = self._mm
+    pos = self._blocos[2 * bloco]
+    inicio = _unzigzag(self._blocos[2 * bloco + 1])
+    for _ in range(i % BLOCO + 1):
+      valor, pos = _le_varint(mm, pos)
+      delta, pos = _le_varint(mm, pos)
+      inicio += _unzigzag(delta)
+      ref, pos = _le_varint(mm, pos)
+      if ref == 0:
+        definicao = pos
+        tam, pos = _le_varint(mm, pos)
+        pos += tam
+    if ref == 0:
+      tam, pos = _le_varint(mm, definicao)
+      lexema = mm[pos:pos + tam].decode("utf-8", "surrogatepass")
+    else:
+      lexema = self._lexema(ref)
+    return Token(_TIPOS[valor], lexema, inicio)
+
+  def __iter__(self) -> Iterator[Token]:
+    for i in range(self._n):
+      yield self[i]
+
+  def close(self):
+    self._definicoes = self._blocos = None
+    self._mv.release()
+    self._mm.close()
+
+  def __enter__(self) -> "TokenFile":
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
@@ -0,0 +1,197 @@
+# Cache de tokens - Compiladores
+# resultados do scanner indexados pelo hash do código-fonte e da configuração da
+# linguagem; arquivos que não mudaram entre builds não são analisados de novo
+# (TokenCache, em disco) e trechos repetidos são servidos da memória (ScanMemo)
+
+import codecs
+import hashlib
+import marshal
+import os
+import tempfile
+from array import array
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple, Union
+
+import lexer_manual
+from lexer_manual import Scanner, SymbolTable, Token, TokenColumns
+
+FORMATO = 2  # versão do formato gravado (muda a chave quando o formato muda)
+
+# impressão digital da configuração do scanner: mudar palavras-chave, operadores ou
+# delimitadores invalida todas as entradas do cache
+def fingerprint() -> str:
+  h = hashlib.blake2b(digest_size=16)
+  config = (
+    FORMATO,
+    marshal.version,
+    tuple(array(tc).itemsize for tc in "BQL"),
+    sorted(lexer_manual.KEYWORDS),
+    sorted((op, tipo.name) for op, tipo in lexer_manual.OPERATORS_2PLUS.items()),
+    sorted((op, tipo.name) for op, tipo in lexer_manual.OPERATORS_1.items()),
+    sorted((d, tipo.name) for d, tipo in lexer_manual.DELIMS.items()),
+    [(tipo.name, tipo.value) for tipo in lexer_manual.TokenType],
+  )
+  h.update(repr(config).encode("utf-8"))
+  return h.hexdigest()
+
+# serialização compacta: arrays das colunas de tokens e da tabela de símbolos como bytes
+def _serializa(cols: TokenColumns) -> bytes:
+  nomes, ids, contagens = cols.symbols.columns()
+  return marshal.dumps((
+    cols.tipos.tobytes(), cols.inicios.tobytes(), cols.tamanhos.tobytes(), cols.simbolos.tobytes(),
+    nomes, ids.tobytes(), contagens.tobytes(), cols.symbols.next_id,
+  ))
+
+def _desserializa(dados: bytes, fonte: str) -> TokenColumns:
+  tipos, inicios, tamanhos, simbolos, nomes, ids, contagens, next_id = marshal.loads(dados)
+  cols = TokenColumns(fonte, SymbolTable.from_columns(nomes, array("Q", ids), array("Q", contagens), next_id))
+  cols.tipos.frombytes(tipos)
+  cols.inicios.frombytes(inicios)
+  cols.tamanhos.frombytes(tamanhos)
+  cols.simbolos.frombytes(simbolos)
+  return cols
+
+# cache persistente num diretório, limitado a max_bytes; ao passar do limite as
+# entradas usadas há mais tempo (mtime, atualizado a cada acerto) são removidas
+class TokenCache:
+  def __init__(self, diretorio: Union[str, "os.PathLike[str]"], max_bytes: int = 256 << 20):
+    self.diretorio = os.fspath(diretorio)
+    self.max_bytes = max_bytes
+    self.acertos = 0
+    self.falhas = 0
+    self._config = fingerprint()
+    os.makedirs(self.diretorio, exist_ok=True)
+    self._tamanho = sum(e.stat().st_size for e in self._entradas())
+
+  def _entradas(self):
+    return [e for e in os.scandir(self.diretorio) if e.name.endswith(".tok")]
+
+  # chave: hash dos bytes do código-fonte, da codificação usada para decodificá-los
+  # e da configuração; os mesmos bytes lidos com outra codificação viram outro texto
+  # (outros inícios e tamanhos de token), então não podem compartilhar a entrada
+  def chave(self, dados: bytes, encoding: str = "utf-8") -> str:
+    h = hashlib.blake2b(dados, digest_size=20)
+    h.update(b"\0" + codecs.lookup(encoding).name.encode("ascii"))
+    h.update(self._config.encode("ascii"))
+    return h.hexdigest()
+
+  def _caminho(self, chave: str) -> str:
+    return os.path.join(self.diretorio, chave + ".tok")
+
+  def _ler(self, chave: str) -> Optional[bytes]:
+    caminho = self._caminho(chave)
+    try:
+      with open(caminho, "rb") as f:
+        dados = f.read()
+      os.utime(caminho)  # marca como usado recentemente
+    except FileNotFoundError:
+      return None
+    return dados
+
+  def _gravar(self, chave: str, dados: bytes):
+    fd, tmp = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+      f.write(dados)
+    os.replace(tmp, self._caminho(chave))  # escrita atômica
+    self._tamanho += len(dados)
+    if self._tamanho > self.max_bytes:
+      self._despejar()
+
+  # remove as entradas menos usadas até caber no limite
+  def _despejar(self):
+    entradas = sorted(self._entradas(), key=lambda e: e.stat().st_mtime_ns)
+    self._tamanho = sum(e.stat().st_size for e in entradas)
+    for e in entradas:
+      if self._tamanho <= self.max_bytes:
+        break
+      try:
+        tamanho = e.stat().st_size
+        os.remove(e.path)
+      except FileNotFoundError:
+        continue  # outro processo já removeu
+      self._tamanho -= tamanho
+
+  # tokens de um código-fonte: do cache, se já analisado, ou do scanner
+  def scan(self, codigo: str, engine: str = "manual") -> TokenColumns:
+    return self._scan(codigo.encode("utf-8", "surrogatepass"), "utf-8", codigo, engine)
+
+  # como scan, lendo o arquivo (a chave usa os bytes do arquivo e a codificação)
+  def scan_path(self, caminho: Union[str, "os.PathLike[str]"], engine: str = "manual",
+                encoding: str = "utf-8") -> TokenColumns:
+    with open(caminho, "rb") as f:
+      dados = f.read()
+    return self._scan(dados, encoding, dados.decode(encoding), engine)
+
+  def _scan(self, dados: bytes, encoding: str, codigo: str, engine: str) -> TokenColumns:
+    chave = self.chave(dados, encoding)
+    salvo = self._ler(chave)
+    if salvo is not None:
+      self.acertos += 1
+      return _desserializa(salvo, codigo)
+    self.falhas += 1
+    cols = Scanner(codigo, engine=engine).scan_columns()
+    self._gravar(chave, _serializa(cols))
+    return cols
+
+  # remove todas as entradas
+  def clear(self):
+    for e in self._entradas():
+      try:
+        os.remove(e.path)
+      except FileNotFoundError:
+        pass
+    self._tamanho = 0
+
+# =========================
+# MEMO EM MEMÓRIA
+# =========================
+TabelaSomenteLeitura = Mapping[str, Mapping[str, int]]
+
+# memoização (LRU) de scan_all por texto de entrada, para trechos pequenos e
+# repetidos; limitada por número de entradas e por um tamanho estimado em bytes
+# Token é mutável, então cada acerto devolve cópias dos tokens guardados e a
+# tabela de símbolos é somente leitura: o chamador não corrompe o cache
+class ScanMemo:
+  BYTES_POR_TOKEN = 64  # estimativa do custo de um Token guardado
+
+  def __init__(self, max_entries: int = 1024, max_bytes: int = 64 << 20, engine: str = "manual"):
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.engine = engine
+    self.acertos = 0
+    self.falhas = 0
+    self._entradas: "OrderedDict[str, Tuple[Tuple[Token, ...], TabelaSomenteLeitura, int]]" = OrderedDict()
+    self._tamanho = 0
+
+  # tokens (tupla) e tabela de símbolos de codigo, iguais aos de Scanner(codigo).scan_all()
+  def scan(self, codigo: str) -> Tuple[Tuple[Token, ...], TabelaSomenteLeitura]:
+    entrada = self._entradas.get(codigo)
+    if entrada is not None:
+      self.acertos += 1
+      self._entradas.move_to_end(codigo)
+      tokens, symbols, _ = entrada
+    else:
+      self.falhas += 1
+      sc = Scanner(codigo, engine=self.engine)
+      tokens = tuple(sc.scan_all())
+      symbols = MappingProxyType(dict(sc.symbols.items()))  # as entradas já são somente leitura
+      self._guardar(codigo, tokens, symbols)
+    return tuple([Token(t.tipo, t.lexema, t.inicio) for t in tokens]), symbols
+
+  def _guardar(self, codigo: str, tokens: Tuple[Token, ...], symbols: TabelaSomenteLeitura):
+    tamanho = len(codigo) + self.BYTES_POR_TOKEN * len(tokens)
+    if tamanho > self.max_bytes:
+      return  # maior que o cache inteiro: não guarda
+    self._entradas[codigo] = (tokens, symbols, tamanho)
+    self._tamanho += tamanho
+    while len(self._entradas) > self.max_entries or self._tamanho > self.max_bytes:
+      _, (_, _, removido) = self._entradas.popitem(last=False)
+      self._tamanho -= removido
+
+  def __len__(self) -> int:
+    return len(self._entradas)
+
+  def clear(self):
+    self._entradas.clear()
+    self._tamanho = 0
@@ -0,0 +1,129 @@
+# Cliente do serviço de análise léxica - Compiladores
+# fala o protocolo NDJSON de lexer_servico: LexerClient (síncrono, com envio em
+# sequência de várias requisições) e AsyncLexerClient (asyncio, várias requisições
+# simultâneas na mesma conexão)
+
+import asyncio
+import itertools
+import json
+import socket
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from lexer_manual import Token, TokenType
+from lexer_servico import LIMITE_LINHA, PORTA_PADRAO
+
+TabelaSimbolos = Dict[str, Dict[str, int]]
+Endereco = Union[Tuple[str, int], str]  # (host, porta) ou caminho de socket Unix
+
+# erro devolvido pelo servidor para uma requisição
+class LexerServiceError(Exception):
+  pass
+
+def _requisicao(id_: int, codigo: str, engine: str) -> bytes:
+  return (json.dumps({"id": id_, "codigo": codigo, "engine": engine}) + "\n").encode("utf-8")
+
+# converte uma resposta em (tokens, tabela de símbolos)
+def _resultado(resposta: dict) -> Tuple[List[Token], TabelaSimbolos]:
+  if "erro" in resposta:
+    raise LexerServiceError(resposta["erro"])
+  tokens = [Token(TokenType[tipo], lexema, inicio) for tipo, lexema, inicio in resposta["tokens"]]
+  return tokens, resposta["symbols"]
+
+# =========================
+# CLIENTE SÍNCRONO
+# =========================
+class LexerClient:
+  def __init__(self, endereco: Endereco = ("127.0.0.1", PORTA_PADRAO), timeout: Optional[float] = None):
+    if isinstance(endereco, str):
+      self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+      self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    self._sock.settimeout(timeout)
+    self._sock.connect(endereco)
+    self._arquivo = self._sock.makefile("rb")
+    self._ids = itertools.count(1)
+
+  def scan(self, codigo: str, engine: str = "manual") -> Tuple[List[Token], TabelaSimbolos]:
+    return self.scan_many([codigo], engine)[0]
+
+  # envia todas as requisições antes de ler as respostas (uma ida e volta para o lote)
+  def scan_many(self, codigos: Iterable[str], engine: str = "manual") -> List[Tuple[List[Token], TabelaSimbolos]]:
+    ids = []
+    dados = bytearray()
+    for codigo in codigos:
+      ids.append(next(self._ids))
+      dados += _requisicao(ids[-1], codigo, engine)
+    self._sock.sendall(dados)
+    resultados = []
+    for id_ in ids:
+      linha = self._arquivo.readline(LIMITE_LINHA + 1)
+      if not linha:
+        raise ConnectionError("o servidor fechou a conexão")
+      resposta = json.loads(linha)
+      if resposta.get("id") != id_:
+        raise LexerServiceError(f"resposta fora de ordem: esperado id {id_}, recebido {resposta.get('id')}")
+      resultados.append(_resultado(resposta))
+    return resultados
+
+  def close(self):
+    self._arquivo.close()
+    self._sock.close()
+
+  def __enter__(self) -> "LexerClient":
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+# =========================
+# CLIENTE ASSÍNCRONO
+# =========================
+# várias corrotinas podem chamar scan ao mesmo tempo; as respostas chegam na ordem
+# dos envios e são entregues pelo id
+class AsyncLexerClient:
+  def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    self._reader = reader
+    self._writer = writer
+    self._ids = itertools.count(1)
+    self._esperando: Dict[int, asyncio.Future] = {}
+    self._leitor = asyncio.create_task(self._le_respostas())
+
+  @classmethod
+  async def connect(cls, endereco: Endereco = ("127.0.0.1", PORTA_PADRAO)) -> "AsyncLexerClient":
+    if isinstance(endereco, str):
+      reader, writer = await asyncio.open_unix_connection(endereco, limit=LIMITE_LINHA)
+    else:
+      reader, writer = await asyncio.open_connection(*endereco, limit=LIMITE_LINHA)
+    return cls(reader, writer)
+
+  async def _le_respostas(self):
+    try:
+      while True:
+        linha = await self._reader.readline()
+        if not linha:
+          break
+        resposta = json.loads(linha)
+        futuro = self._esperando.pop(resposta.get("id"), None)
+        if futuro is not None and not futuro.done():
+          futuro.set_result(resposta)
+    finally:
+      for futuro in self._esperando.values():
+        if not futuro.done():
+          futuro.set_exception(ConnectionError("o servidor fechou a conexão"))
+      self._esperando.clear()
+
+  async def scan(self, codigo: str, engine: str = "manual") -> Tuple[List[Token], TabelaSimbolos]:
+    id_ = next(self._ids)
+    futuro = asyncio.get_running_loop().create_future()
+    self._esperando[id_] = futuro
+    self._writer.write(_requisicao(id_, codigo, engine))
+    await self._writer.drain()
+    return _resultado(await futuro)
+
+  async def close(self):
+    self._writer.close()
+    try:
+      await self._writer.wait_closed()
+    except ConnectionError:
+      pass
+    self._leitor.cancel()
@@ -1,9 +1,28 @@
 # Analisador Léxico Manual em Python - Compiladores
 # Francisco Renêr Lopes Crisostomo
 
-from dataclasses import dataclass
+import argparse
+import codecs
+import glob
+import io
+import mmap as _mmap
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import List, Dict
+from itertools import accumulate, islice
+from json.encoder import encode_basestring
+from types import MappingProxyType
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 # =========================
 # TIPOS DE TOKEN (granular)
@@ -58,12 +77,16 @@ class TokenType(Enum):
   LBRACKET = auto() # [
   RBRACKET = auto() # ]
 
-# estrutura de um token
-@dataclass
+# estrutura de um token (slots: sem __dict__ por instância)
+@dataclass(slots=True)
 class Token:
   tipo: TokenType   # tipo (enum acima)
   lexema: str       # representação textual do token
             # para ID será idN; para outros, o lexema literal
+  inicio: int = field(default=-1, compare=False)  # posição no código-fonte (-1 = desconhecida)
+                    # em caracteres do texto decodificado, não em bytes do arquivo
+                    # (só coincidem em ASCII ou codificações de 1 byte por caractere);
+                    # linha/coluna são calculadas sob demanda por Scanner.posicao
 
 # =========================
 # CONFIGURAÇÃO DA LINGUAGEM
@@ -112,27 +135,828 @@ DELIMS = {
   "]": TokenType.RBRACKET,
 }
 
+# =========================
+# LEXEMAS COMPARTILHADOS
+# =========================
+# palavras-chave, operadores e nomes idN reaproveitam sempre o mesmo objeto str,
+# em vez de um lexema novo por ocorrência
+_KEYWORDS_LEXEMA = {kw: kw for kw in KEYWORDS}
+
+# todos os operadores e delimitadores, com seus tipos
+_OPERADORES = {**OPERATORS_1, **DELIMS, **OPERATORS_2PLUS}
+
+# lexema → (tipo, lexema compartilhado)
+_OP_2PLUS = {op: (tipo, op) for op, tipo in OPERATORS_2PLUS.items()}
+_OP_TODOS = {op: (tipo, op) for op, tipo in _OPERADORES.items()}
+
+# lexema → lexema compartilhado, para palavras-chave, operadores e delimitadores
+# reconstruídos a partir do código-fonte (TokenColumns)
+_LEXEMAS_FIXOS = {**_KEYWORDS_LEXEMA, **{op: op for op in _OPERADORES}}
+
+# TokenType pelo valor (TokenType(v) é bem mais lento que uma indexação)
+_TIPOS_POR_VALOR: List[Optional[TokenType]] = [None] * (max(t.value for t in TokenType) + 1)
+for _tipo in TokenType:
+  _TIPOS_POR_VALOR[_tipo.value] = _tipo
+
+# _LEXEMAS_ID[n] == "idN" (cresce conforme aparecem ids maiores)
+_LEXEMAS_ID: List[str] = [""]
+
+def _estende_lexemas_id(sym_id: int):
+  while len(_LEXEMAS_ID) <= sym_id:
+    _LEXEMAS_ID.append(f"id{len(_LEXEMAS_ID)}")
+
+# =========================
+# ENGINE REGEX (padrão mestre)
+# =========================
+
+# corpo de literal de string/char reproduzindo o scanner manual: escapes consomem o
+# próximo caractere e uma aspa logo após "\\\\" não fecha o literal; para no \0
+def _corpo_literal(aspa: str) -> str:
+  q = re.escape(aspa)
+  return rf"{q}(?:\\\\{q}?|\\[^\0]|[^{q}\\\0]+|\\)*(?P<{{fim}}>{q})?"
+
+# comentário de linha (até \n ou \0) ou de bloco (até */, \0 ou fim)
+_COMENTARIO = r"//[^\n\0]*\n?|/\*(?:[^*\0]+|\*(?!/))*(?:\*/)?"
+
+def _compila_padrao_mestre() -> "re.Pattern[str]":
+  operadores = sorted(_OPERADORES, key=len, reverse=True)  # maximal munch: mais longos primeiro
+  # espaços e comentários são pulados no prefixo do próprio match
+  ignorar = rf"(?:\s+|{_COMENTARIO})*"
+  regras = [
+    ("PP", r"\#[^\n\0]*\n?"),
+    ("STRING", _corpo_literal('"').format(fim="STRING_FIM")),
+    ("CHAR", _corpo_literal("'").format(fim="CHAR_FIM")),
+    ("ID", r"[A-Za-z_]\w*"),
+    ("NUM", r"[0-9]+(?P<NUM_PONTO>\.[0-9]+)?(?:(?P<NUM_VIRGULA>,[0-9]*)|(?P<NUM_ERRO>\w+))?"),
+    ("OP", "|".join(re.escape(op) for op in operadores)),
+    ("ERRO", r"[\s\S]"),
+  ]
+  tokens = "|".join(f"(?P<{nome}>{padrao})" for nome, padrao in regras)
+  return re.compile(rf"{ignorar}(?:{tokens}|\Z)")
+
+_PADRAO_MESTRE = _compila_padrao_mestre()
+
+# pré-varredura para dividir a entrada: reconhece só o que pode conter uma quebra de
+# linha que não separa tokens (literais, comentários, diretivas); o resto é texto comum
+_PADRAO_CONTEXTO = re.compile("|".join([
+  _corpo_literal('"').format(fim="ASPA_FIM"),
+  _corpo_literal("'").format(fim="APOS_FIM"),
+  _COMENTARIO,
+  r"\#[^\n\0]*\n?",
+  r"(?P<COMUM>[^\"'/\#]+|/)",
+]))
+
+# posições onde a entrada pode ser dividida em (até) `partes` segmentos que o scanner
+# analisa de forma independente: logo após uma quebra de linha fora de literais,
+# comentários e diretivas. Retorna as fronteiras [0, ..., len(codigo)]
+def split_points(codigo: str, partes: int) -> List[int]:
+  n = len(codigo)
+  alvos = [n * k // partes for k in range(1, partes)]
+  pontos = [0]
+  k = 0
+  for m in _PADRAO_CONTEXTO.finditer(codigo):
+    if k == len(alvos):
+      break
+    if m.lastgroup != "COMUM" or m.end() <= alvos[k]:
+      continue
+    ini, fim = m.span()
+    while k < len(alvos) and alvos[k] < fim:
+      nl = codigo.find("\n", max(ini, alvos[k], pontos[-1]), fim)
+      if nl < 0:
+        break
+      pontos.append(nl + 1)
+      while k < len(alvos) and alvos[k] <= nl:
+        k += 1  # alvos já ultrapassados
+  pontos.append(n)
+  return sorted(set(pontos))
+
+# padrões usados pelo scanner manual para recortar um token inteiro de uma vez
+# (\w é exatamente isalnum() ou "_")
+_DIRETIVA = re.compile(r"\#[^\n\0]*\n?")
+_LITERAL = {aspa: re.compile(_corpo_literal(aspa).format(fim="FIM")) for aspa in "\"'"}
+_PARTE_IDENT = re.compile(r"\w+")
+_ESPACOS = re.compile(r"\s*")  # \s é exatamente isspace()
+
+# o scanner manual duplica as quebras de linha literais dentro de strings/chars
+# (as escapadas com barra não são duplicadas)
+_ESCAPE_OU_QUEBRA = re.compile(r"\\[^\0]|\n")
+
+def _duplica_quebras(lex: str) -> str:
+  return _ESCAPE_OU_QUEBRA.sub(lambda m: "\n\n" if m.group() == "\n" else m.group(), lex)
+
+# =========================
+# ENGINE AFD (tabelas de transição)
+# =========================
+# classes de caracteres (ASCII); qualquer caractere >= 128 é _C_NAO_ASCII
+(_C_OUTRO, _C_NL, _C_WS, _C_NUL, _C_LETRA, _C_DIG, _C_ASPA, _C_APOS, _C_BARRA_INV, _C_HASH,
+ _C_SLASH, _C_STAR, _C_EQ, _C_BANG, _C_LT, _C_GT, _C_AMP, _C_PIPE, _C_MINUS, _C_PLUS,
+ _C_DOT, _C_COMMA, _C_SIMPLES, _C_NAO_ASCII) = range(24)
+_NUM_CLASSES = 24
+
+# ações dos estados de aceitação
+(_A_NENHUMA, _A_PULA, _A_ID, _A_NUM, _A_FLOAT, _A_ERRO_NUM, _A_PP, _A_STRING, _A_CHAR,
+ _A_ERRO_LIT, _A_OP, _A_ERRO) = range(12)
+
+def _classes_ascii() -> bytes:
+  tabela = bytearray(_C_OUTRO for _ in range(128))
+  especiais = {
+    "\n": _C_NL, "\0": _C_NUL, '"': _C_ASPA, "'": _C_APOS, "\\": _C_BARRA_INV, "#": _C_HASH,
+    "/": _C_SLASH, "*": _C_STAR, "=": _C_EQ, "!": _C_BANG, "<": _C_LT, ">": _C_GT,
+    "&": _C_AMP, "|": _C_PIPE, "-": _C_MINUS, "+": _C_PLUS, ".": _C_DOT, ",": _C_COMMA,
+  }
+  for o in range(128):
+    ch = chr(o)
+    if ch in especiais:
+      tabela[o] = especiais[ch]
+    elif ch.isspace():
+      tabela[o] = _C_WS
+    elif ch.isalpha() or ch == "_":
+      tabela[o] = _C_LETRA
+    elif ch.isdigit():
+      tabela[o] = _C_DIG
+    elif ch in _OPERADORES:
+      tabela[o] = _C_SIMPLES  # % e delimitadores
+  return bytes(tabela)
+
+# estados: nome → (ação de aceitação, {classes: próximo estado}, estado padrão para as demais classes)
+_TODAS = tuple(range(_NUM_CLASSES))
+_ESTADOS_AFD = {
+  "INICIO": (_A_NENHUMA, {
+    (_C_WS, _C_NL): "WS", (_C_LETRA,): "ID", (_C_DIG,): "NUM", (_C_HASH,): "PP",
+    (_C_ASPA,): "STR", (_C_APOS,): "CHR", (_C_SLASH,): "SLASH", (_C_STAR,): "OP_IGUAL",
+    (_C_PLUS,): "OP_IGUAL", (_C_EQ,): "OP_IGUAL", (_C_BANG,): "OP_IGUAL", (_C_LT,): "OP_IGUAL",
+    (_C_GT,): "OP_IGUAL", (_C_MINUS,): "MINUS", (_C_AMP,): "AMP", (_C_PIPE,): "PIPE",
+    (_C_DOT,): "DOT", (_C_COMMA, _C_SIMPLES): "OP_FIM",
+  }, "ERRO"),
+  "WS": (_A_PULA, {(_C_WS, _C_NL): "WS"}, None),
+  "ID": (_A_ID, {(_C_LETRA, _C_DIG): "ID"}, None),
+  # números: 10, 3.14; "3,14" e "8a" são erro
+  "NUM": (_A_NUM, {(_C_DIG,): "NUM", (_C_DOT,): "NUM_PONTO", (_C_COMMA,): "NUM_VIRGULA",
+                   (_C_LETRA,): "NUM_ERRO"}, None),
+  "NUM_PONTO": (_A_NENHUMA, {(_C_DIG,): "FLOAT"}, None),
+  "FLOAT": (_A_FLOAT, {(_C_DIG,): "FLOAT", (_C_COMMA,): "NUM_VIRGULA", (_C_LETRA,): "NUM_ERRO"}, None),
+  "NUM_VIRGULA": (_A_ERRO_NUM, {(_C_DIG,): "NUM_VIRGULA"}, None),
+  "NUM_ERRO": (_A_ERRO_NUM, {(_C_LETRA, _C_DIG): "NUM_ERRO"}, None),
+  # diretiva até o fim da linha (a quebra de linha é consumida)
+  "PP": (_A_PP, {(_C_NL,): "PP_FIM", (_C_NUL,): None}, "PP"),
+  "PP_FIM": (_A_PP, {}, None),
+  # comentários são consumidos e ignorados (bloco não fechado vai até o fim / \0)
+  "SLASH": (_A_OP, {(_C_SLASH,): "COM_LINHA", (_C_STAR,): "COM_BLOCO", (_C_EQ,): "OP_FIM"}, None),
+  "COM_LINHA": (_A_PULA, {(_C_NL,): "COM_FIM", (_C_NUL,): None}, "COM_LINHA"),
+  "COM_BLOCO": (_A_PULA, {(_C_STAR,): "COM_BLOCO_STAR", (_C_NUL,): None}, "COM_BLOCO"),
+  "COM_BLOCO_STAR": (_A_PULA, {(_C_SLASH,): "COM_FIM", (_C_STAR,): "COM_BLOCO_STAR", (_C_NUL,): None}, "COM_BLOCO"),
+  "COM_FIM": (_A_PULA, {}, None),
+  # operadores
+  "OP_IGUAL": (_A_OP, {(_C_EQ,): "OP_FIM"}, None),  # = ! < > + * seguidos de =
+  "MINUS": (_A_OP, {(_C_EQ, _C_GT): "OP_FIM"}, None),
+  "AMP": (_A_ERRO, {(_C_AMP,): "OP_FIM"}, None),
+  "PIPE": (_A_ERRO, {(_C_PIPE,): "OP_FIM"}, None),
+  "DOT": (_A_OP, {(_C_DOT,): "DOT2"}, None),
+  "DOT2": (_A_NENHUMA, {(_C_DOT,): "OP_FIM"}, None),
+  "OP_FIM": (_A_OP, {}, None),
+  "ERRO": (_A_ERRO, {}, None),
+}
+# literais de string e char: sem fechamento viram ERRO; depois de "\\" escapado a aspa não fecha
+for _pre, _aspa, _acao in (("STR", _C_ASPA, _A_STRING), ("CHR", _C_APOS, _A_CHAR)):
+  _ESTADOS_AFD[_pre] = (_A_ERRO_LIT, {(_aspa,): _pre + "_FIM", (_C_BARRA_INV,): _pre + "_ESC", (_C_NUL,): None}, _pre)
+  _ESTADOS_AFD[_pre + "_ESC"] = (_A_ERRO_LIT, {(_C_BARRA_INV,): _pre + "_BS", (_C_NUL,): None}, _pre)
+  _ESTADOS_AFD[_pre + "_BS"] = (_A_ERRO_LIT, {(_C_BARRA_INV,): _pre + "_ESC", (_C_NUL,): None}, _pre)
+  _ESTADOS_AFD[_pre + "_FIM"] = (_acao, {}, None)
+
+# monta as tabelas planas: o estado é guardado já multiplicado por _NUM_CLASSES,
+# então a transição é trans[estado + classe] (0 = estado morto)
+def _constroi_afd():
+  nomes = ["MORTO"] + list(_ESTADOS_AFD)
+  indice = {nome: k * _NUM_CLASSES for k, nome in enumerate(nomes)}
+  trans = array("H", bytes(2 * len(nomes) * _NUM_CLASSES))
+  aceita = bytearray(len(nomes) * _NUM_CLASSES)
+  for nome, (acao, arestas, padrao) in _ESTADOS_AFD.items():
+    base = indice[nome]
+    aceita[base] = acao
+    destinos = {c: padrao for c in _TODAS}
+    for classes, destino in arestas.items():
+      for c in classes:
+        destinos[c] = destino
+    for c, destino in destinos.items():
+      trans[base + c] = indice[destino] if destino else 0
+  return indice["INICIO"], trans, bytes(aceita)
+
+_AFD_CLASSE = _classes_ascii()
+_AFD_INICIO, _AFD_TRANS, _AFD_ACEITA = _constroi_afd()
+
+# engines disponíveis: nome → método que reconhece um token
+ENGINES = {
+  "manual": "_scan_token",
+  "regex": "_scan_token_regex",
+  "afd": "_scan_token_afd",
+}
+
+# =========================
+# TABELA DE SÍMBOLOS
+# =========================
+# nomes, ids e contagens em colunas paralelas (posição = ordem de inserção), com
+# índices nome → posição e id → posição. Continua se comportando como o dict
+# {nome: {"id": int, "count": int}} de antes, só para leitura: tabela["a"]["count"],
+# items(), len, comparação com dicts. Um nome removido deixa a posição vazia (None)
+# e os ids nunca são reaproveitados. Enquanto os ids forem 1, 2, 3... na ordem de
+# inserção (o caso do scanner), id → posição é só id - 1, sem índice.
+# o índice nome → posição é também a tabela de consulta do scanner: o scanner guarda
+# nele as palavras reservadas (palavra → lexema, str), que ficam fora da visão de
+# mapeamento; assim uma única consulta decide entre palavra-chave e símbolo sem
+# uma segunda cópia do índice. Uma palavra reservada nunca vira símbolo: add (e
+# reservar palavras que já são símbolos) levanta ValueError
+class SymbolTable(Mapping):
+  def __init__(self, tabela: Optional[Mapping[str, Mapping[str, int]]] = None):
+    self.nomes: List[Optional[str]] = []
+    self.ids = array("Q")
+    self.contagens = array("Q")
+    self.next_id = 1                   # próximo id a atribuir
+    self._posicao: Dict[str, Union[int, str]] = {}  # nome → posição (palavra reservada → lexema)
+    self._reservadas = False           # palavras reservadas já guardadas em _posicao
+    self._n_reservadas = 0             # entradas de _posicao que são palavras reservadas
+    self._por_id: Optional[Dict[int, int]] = None  # id → posição (None: posição = id - 1)
+    self._versao = 0                   # muda quando um nome entra ou sai
+    self._por_nome: Optional[Tuple[int, List[int]]] = None  # cache: (versão, posições em ordem alfabética)
+    self._ranking: Optional[List[int]] = None  # cache: posições por contagem (None quando uma contagem muda)
+    if tabela is not None:
+      for nome, dado in tabela.items():
+        self.add(nome, dado["count"], dado["id"])
+
+  # monta a tabela a partir das colunas (ex.: desserialização); next_id padrão: maior id + 1
+  @classmethod
+  def from_columns(cls, nomes: List[str], ids: Iterable[int], contagens: Iterable[int],
+                   next_id: Optional[int] = None) -> "SymbolTable":
+    tabela = cls()
+    tabela.nomes = list(nomes)
+    tabela.ids = array("Q", ids)
+    tabela.contagens = array("Q", contagens)
+    tabela._posicao = {nome: k for k, nome in enumerate(tabela.nomes)}
+    if any(sym_id != k for k, sym_id in enumerate(tabela.ids, 1)):
+      tabela._por_id = {sym_id: k for k, sym_id in enumerate(tabela.ids)}
+    tabela.next_id = next_id if next_id is not None else max(tabela.ids, default=0) + 1
+    return tabela
+
+  # guarda as palavras reservadas (palavra → lexema compartilhado) no índice de nomes,
+  # uma única vez; ValueError se alguma já for símbolo da tabela
+  def _reserva(self, palavras: Mapping[str, str]):
+    if self._reservadas:
+      return
+    simbolos = sorted(palavra for palavra in palavras if palavra in self)
+    if simbolos:
+      raise ValueError(f"palavras reservadas não podem ser símbolos: {', '.join(simbolos)}")
+    self._posicao.update(palavras)
+    self._n_reservadas = len(palavras)
+    self._reservadas = True
+
+  # posições dos nomes presentes, na ordem de inserção
+  def _posicoes(self) -> Iterable[int]:
+    if len(self) == len(self.nomes):
+      return range(len(self.nomes))
+    return [k for k, nome in enumerate(self.nomes) if nome is not None]
+
+  # posição do nome (KeyError se não for um símbolo da tabela)
+  def _posicao_do_nome(self, nome: str) -> int:
+    k = self._posicao[nome]
+    if k.__class__ is not int:
+      raise KeyError(nome)
+    return k
+
+  # colunas só com os nomes presentes, na ordem de inserção
+  def columns(self) -> Tuple[List[str], array, array]:
+    posicoes = self._posicoes()
+    return ([self.nomes[k] for k in posicoes], array("Q", [self.ids[k] for k in posicoes]),
+            array("Q", [self.contagens[k] for k in posicoes]))
+
+  # entre processos vai só o compacto (colunas); os índices são refeitos ao chegar
+  def __reduce__(self):
+    return (SymbolTable.from_columns, (*self.columns(), self.next_id))
+
+  # acrescenta um nome que ainda não está na tabela; retorna a posição
+  def _novo(self, nome: str, sym_id: int, count: int) -> int:
+    k = len(self.nomes)
+    self.nomes.append(nome)
+    self.ids.append(sym_id)
+    self.contagens.append(count)
+    self._posicao[nome] = k
+    if self._por_id is not None:
+      self._por_id[sym_id] = k
+    elif sym_id != k + 1:
+      self._por_id = {i: p for p, i in enumerate(self.ids) if self.nomes[p] is not None}
+    if sym_id >= self.next_id:
+      self.next_id = sym_id + 1
+    if sym_id >= len(_LEXEMAS_ID):
+      _estende_lexemas_id(sym_id)  # o scanner emite o lexema idN de qualquer símbolo da tabela
+    self._versao += 1
+    self._ranking = None
+    return k
+
+  # soma count ocorrências ao nome; um nome novo recebe sym_id (ou o próximo id)
+  # retorna o id do nome
+  def add(self, nome: str, count: int = 1, sym_id: Optional[int] = None) -> int:
+    k = self._posicao.get(nome)
+    if k.__class__ is int:
+      if sym_id is not None and sym_id != self.ids[k]:
+        raise ValueError(f"{nome!r} já tem o id {self.ids[k]}, não {sym_id}")
+      self.contagens[k] += count
+      self._ranking = None
+      return self.ids[k]
+    if k is not None:
+      raise ValueError(f"{nome!r} é uma palavra reservada, não um símbolo")
+    if sym_id is None:
+      sym_id = self.next_id
+    elif self._tem_id(sym_id):
+      raise ValueError(f"id {sym_id} já pertence a {self.name_of(sym_id)!r}")
+    self._novo(nome, sym_id, count)
+    return sym_id
+
+  # caminho do scanner, com a posição que a consulta ao índice já encontrou:
+  # mais uma ocorrência do símbolo na posição k; retorna o id
+  def _ocorrencia(self, k: int) -> int:
+    self.contagens[k] += 1
+    self._ranking = None
+    return self.ids[k]
+
+  # caminho do scanner: primeira ocorrência de um nome que não está no índice;
+  # recebe o próximo id, que é retornado
+  def _primeira_ocorrencia(self, nome: str) -> int:
+    sym_id = self.next_id
+    self._novo(nome, sym_id, 1)
+    return sym_id
+
+  # posição do símbolo sym_id (KeyError se não estiver na tabela)
+  def _posicao_do_id(self, sym_id: int) -> int:
+    if self._por_id is not None:
+      return self._por_id[sym_id]
+    k = sym_id - 1
+    if 0 <= k < len(self.nomes) and self.nomes[k] is not None:
+      return k
+    raise KeyError(sym_id)
+
+  def _tem_id(self, sym_id: int) -> bool:
+    try:
+      self._posicao_do_id(sym_id)
+    except KeyError:
+      return False
+    return True
+
+  # tira uma ocorrência do símbolo; ao chegar a zero o nome sai da tabela
+  # retorna a contagem que sobrou
+  def decrement(self, sym_id: int) -> int:
+    k = self._posicao_do_id(sym_id)
+    restante = self.contagens[k] - 1
+    self.contagens[k] = restante
+    self._ranking = None
+    if restante == 0:
+      del self._posicao[self.nomes[k]]
+      self._versao += 1
+      if self._por_id is not None:
+        del self._por_id[sym_id]
+      self.nomes[k] = None
+    return restante
+
+  def id_of(self, nome: str) -> int:
+    return self.ids[self._posicao_do_nome(nome)]
+
+  def name_of(self, sym_id: int) -> str:
+    return self.nomes[self._posicao_do_id(sym_id)]
+
+  def count_of(self, nome: str) -> int:
+    return self.contagens[self._posicao_do_nome(nome)]
+
+  # junta outra tabela a esta, na ordem dos ids da outra: cada nome novo recebe o
+  # próximo id desta tabela e as contagens somam. Retorna o mapa id da outra → id
+  # nesta (a posição 0 e ids ausentes valem 0)
+  def merge(self, outra: Mapping[str, Mapping[str, int]]) -> List[int]:
+    if not isinstance(outra, SymbolTable):
+      outra = SymbolTable(outra)
+    mapa = [0] * outra.next_id
+    for k in sorted(outra._posicoes(), key=outra.ids.__getitem__):
+      mapa[outra.ids[k]] = self.add(outra.nomes[k], outra.contagens[k])
+    return mapa
+
+  # (nome, id, contagem) na ordem de inserção ou alfabética; a ordem alfabética
+  # fica guardada até um nome entrar ou sair
+  def entries(self, sort_by_name: bool = False) -> List[Tuple[str, int, int]]:
+    if sort_by_name:
+      if self._por_nome is None or self._por_nome[0] != self._versao:
+        self._por_nome = (self._versao, [self._posicao[nome] for nome in sorted(self)])
+      posicoes = self._por_nome[1]
+    else:
+      posicoes = self._posicoes()
+    nomes, ids, contagens = self.nomes, self.ids, self.contagens
+    return [(nomes[k], ids[k], contagens[k]) for k in posicoes]
+
+  # os k símbolos mais frequentes como (nome, id, contagem), por contagem decrescente
+  # (empate: menor id); a ordenação fica guardada até a tabela ou uma contagem mudar
+  # (quem altera contagens, inclusive o scanner, descarta _ranking)
+  def top(self, k: int = 10) -> List[Tuple[str, int, int]]:
+    nomes, ids, contagens = self.nomes, self.ids, self.contagens
+    if self._ranking is None:
+      self._ranking = sorted(self._posicoes(), key=lambda p: (-contagens[p], ids[p]))
+    return [(nomes[p], ids[p], contagens[p]) for p in self._ranking[:k]]
+
+  # cópia como dict comum (ex.: para json.dumps)
+  def to_dict(self) -> Dict[str, Dict[str, int]]:
+    ids, contagens = self.ids, self.contagens
+    nomes = self.nomes
+    return {nomes[k]: {"id": ids[k], "count": contagens[k]} for k in self._posicoes()}
+
+  # visão compatível com o dict antigo (somente leitura)
+  def __getitem__(self, nome: str) -> Mapping[str, int]:
+    k = self._posicao_do_nome(nome)
+    return MappingProxyType({"id": self.ids[k], "count": self.contagens[k]})
+
+  def __contains__(self, nome: object) -> bool:
+    return self._posicao.get(nome).__class__ is int
+
+  def __iter__(self) -> Iterator[str]:
+    if len(self) == len(self.nomes):
+      return iter(self.nomes)
+    return (nome for nome in self.nomes if nome is not None)
+
+  def __len__(self) -> int:
+    return len(self._posicao) - self._n_reservadas
+
+  def __repr__(self) -> str:
+    return f"SymbolTable({self.to_dict()!r})"
+
+# =========================
+# SAÍDA EM COLUNAS
+# =========================
+# tokens como arrays paralelos (struct-of-arrays): tipo (TokenType.value), posição
+# inicial e tamanho no código-fonte, e id do símbolo (0 para o que não é ID).
+# os arrays expõem o buffer diretamente (ex.: numpy.frombuffer(cols.tipos, numpy.uint8))
+# e os lexemas são reconstruídos sob demanda a partir do código-fonte
+class TokenColumns:
+  def __init__(self, fonte: Optional[str], symbols: SymbolTable):
+    self.fonte = fonte      # código-fonte completo (None para entrada lida em blocos)
+    self.symbols = symbols  # tabela de símbolos do scanner
+    self.tipos = array("B")
+    self.inicios = array("Q")
+    self.tamanhos = array("L")
+    self.simbolos = array("L")
+
+  def __len__(self) -> int:
+    return len(self.tipos)
+
+  # reconstrói o lexema do k-ésimo token como o scanner o teria gerado
+  def lexema(self, k: int) -> str:
+    tipo = _TIPOS_POR_VALOR[self.tipos[k]]
+    if tipo is TokenType.ID:
+      return f"id{self.simbolos[k]}"
+    if tipo is TokenType.EOF:
+      return ""
+    if self.fonte is None:
+      raise ValueError("lexema indisponível: o código-fonte não foi mantido (entrada em blocos)")
+    ini = self.inicios[k]
+    lex = self.fonte[ini:ini + self.tamanhos[k]]
+    if tipo is TokenType.PP_DIRECTIVE:
+      return lex.strip()
+    if "\n" in lex:  # literais de string/char (fechados ou não)
+      return _duplica_quebras(lex)
+    return lex
+
+  def token(self, k: int) -> Token:
+    return Token(_TIPOS_POR_VALOR[self.tipos[k]], self.lexema(k), self.inicios[k])
+
+  # todos os tokens num único laço: tipo por indexação, idN, palavras-chave e
+  # operadores com os mesmos lexemas compartilhados que o scanner usa
+  def __iter__(self) -> Iterator[Token]:
+    fonte = self.fonte
+    if fonte is None:
+      for k in range(len(self.tipos)):
+        yield self.token(k)
+      return
+    if self.simbolos:
+      _estende_lexemas_id(max(self.simbolos))
+    tipos_por_valor, lexemas_id, fixos = _TIPOS_POR_VALOR, _LEXEMAS_ID, _LEXEMAS_FIXOS
+    pp, eof = TokenType.PP_DIRECTIVE, TokenType.EOF
+    for valor, ini, tamanho, sym in zip(self.tipos, self.inicios, self.tamanhos, self.simbolos):
+      tipo = tipos_por_valor[valor]
+      if sym:  # só IDs têm símbolo
+        yield Token(tipo, lexemas_id[sym], ini)
+        continue
+      lex = fonte[ini:ini + tamanho]
+      compartilhado = fixos.get(lex)
+      if compartilhado is not None and tipo is not TokenType.ERRO:
+        lex = compartilhado
+      elif tipo is pp:
+        lex = lex.strip()
+      elif tipo is eof:
+        lex = ""
+      elif "\n" in lex:  # literais de string/char (fechados ou não)
+        lex = _duplica_quebras(lex)
+      yield Token(tipo, lex, ini)
+
+  # histograma de tipos contado direto sobre o buffer de bytes
+  def contagem_por_tipo(self) -> Dict[TokenType, int]:
+    dados = self.tipos.tobytes()
+    contagem = {}
+    for tipo in TokenType:
+      n = dados.count(tipo.value)
+      if n:
+        contagem[tipo] = n
+    return contagem
+
+# =========================
+# SAÍDA FORMATADA
+# =========================
+# formatos de saída: "texto" (colunas alinhadas, como print_tokens), "tsv" (tab,
+# com \\, \t, \n e \r escapados no lexema) e "jsonl" (um objeto JSON por linha);
+# com arquivo, tsv ganha uma primeira coluna e jsonl um campo "arquivo" (texto não muda)
+FORMATOS = ("texto", "tsv", "jsonl")
+
+_ESCAPE_TSV = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _prefixos(arquivo: Optional[str]) -> Tuple[str, str]:
+  if arquivo is None:
+    return "", ""
+  return f"{arquivo.translate(_ESCAPE_TSV)}\t", f'"arquivo": {encode_basestring(arquivo)}, '
+
+def _formata_token(formato: str, arquivo: Optional[str] = None):
+  tsv, jsonl = _prefixos(arquivo)
+  if formato == "texto":
+    return lambda t: f"{t.tipo.name:<7}  {t.lexema}\n"
+  if formato == "tsv":
+    return lambda t: f"{tsv}{t.tipo.name}\t{t.lexema.translate(_ESCAPE_TSV)}\t{t.inicio}\n"
+  if formato == "jsonl":
+    return lambda t: f'{{{jsonl}"tipo": "{t.tipo.name}", "lexema": {encode_basestring(t.lexema)}, "inicio": {t.inicio}}}\n'
+  raise ValueError(f"formato desconhecido: {formato!r} (use um de {', '.join(FORMATOS)})")
+
+# write do stream para str: streams binários recebem UTF-8
+def _escritor(stream: IO):
+  if isinstance(stream, io.TextIOBase):
+    return stream.write
+  return lambda texto: stream.write(texto.encode("utf-8", "surrogatepass"))
+
+# escreve os tokens formatados em blocos: uma única chamada a write a cada
+# `bloco` tokens (tokens pode ser um gerador, ex.: Scanner.iter_tokens())
+def write_tokens(stream: IO, tokens: Iterable[Token], formato: str = "texto", bloco: int = 4096,
+                 arquivo: Optional[str] = None):
+  formata = _formata_token(formato, arquivo)
+  escreve = _escritor(stream)
+  tokens = iter(tokens)
+  while True:
+    linhas = list(map(formata, islice(tokens, bloco)))
+    if not linhas:
+      break
+    escreve("".join(linhas))
+
+# escreve a tabela de símbolos (ordem de inserção ou alfabética) com uma única write
+# (symbols pode ser uma SymbolTable ou um dict {nome: {"id", "count"}})
+def write_symbol_table(stream: IO, symbols: Mapping[str, Mapping[str, int]], sort_by_name: bool = False,
+                       formato: str = "texto", arquivo: Optional[str] = None):
+  tsv, jsonl = _prefixos(arquivo)
+  if not isinstance(symbols, SymbolTable):
+    symbols = SymbolTable(symbols)
+  entradas = symbols.entries(sort_by_name)
+  if formato == "texto":
+    linhas = [f"id{sym_id:<3}  {name:<15}  ocorrências: {count}\n" for name, sym_id, count in entradas]
+  elif formato == "tsv":
+    linhas = [f"{tsv}{sym_id}\t{name}\t{count}\n" for name, sym_id, count in entradas]
+  elif formato == "jsonl":
+    linhas = [f'{{{jsonl}"id": {sym_id}, "nome": {encode_basestring(name)}, "count": {count}}}\n'
+              for name, sym_id, count in entradas]
+  else:
+    raise ValueError(f"formato desconhecido: {formato!r} (use um de {', '.join(FORMATOS)})")
+  _escritor(stream)("".join(linhas))
+
+# =========================
+# LEITURA EM BLOCOS
+# =========================
+# lê o arquivo em blocos de chunk_size, decodificando bytes de forma incremental
+# (um caractere multibyte pode ficar dividido entre dois blocos)
+def _ler_blocos(arquivo: IO, chunk_size: int, encoding: str, fechar: bool) -> Iterator[str]:
+  decoder = None
+  try:
+    while True:
+      dado = arquivo.read(chunk_size)
+      if isinstance(dado, str):
+        if not dado:
+          return
+        yield dado
+        continue
+      if decoder is None:
+        decoder = codecs.getincrementaldecoder(encoding)()
+      texto = decoder.decode(dado, final=not dado)
+      if texto:
+        yield texto
+      if not dado:
+        return
+  finally:
+    if fechar:
+      arquivo.close()
+
+# lê o arquivo mapeado em memória: cada bloco é decodificado direto de uma fatia
+# do memoryview (sem cópias intermediárias de read())
+def _ler_blocos_mmap(caminho: Union[str, "os.PathLike[str]"], chunk_size: int, encoding: str) -> Iterator[str]:
+  with open(caminho, "rb") as arquivo:
+    if os.fstat(arquivo.fileno()).st_size == 0:
+      return  # mmap não aceita arquivo vazio
+    with _mmap.mmap(arquivo.fileno(), 0, access=_mmap.ACCESS_READ) as mapa:
+      decoder = codecs.getincrementaldecoder(encoding)()
+      with memoryview(mapa) as buf:
+        for pos in range(0, len(buf), chunk_size):
+          with buf[pos:pos + chunk_size] as fatia:
+            texto = decoder.decode(fatia)
+          if texto:
+            yield texto
+      texto = decoder.decode(b"", final=True)
+      if texto:
+        yield texto
+
+# acrescenta ao índice as posições logo após cada \n do texto (que começa na posição base)
+def _indexa_linhas(linhas: array, texto: str, base: int):
+  pos = texto.find("\n")
+  while pos >= 0:
+    linhas.append(base + pos + 1)
+    pos = texto.find("\n", pos + 1)
+
+# =========================
+# INSTRUMENTAÇÃO
+# =========================
+# ramo do scanner manual que produziu cada tipo de token; os demais (ERRO e
+# operadores/delimitadores) são classificados pelo primeiro caractere
+_REGRA_POR_TIPO = {
+  TokenType.PP_DIRECTIVE: "diretiva",
+  TokenType.STRING: "string",
+  TokenType.CHAR: "char",
+  TokenType.ID: "identificador",
+  TokenType.KEYWORD: "identificador",
+  TokenType.NUM: "numero",
+  TokenType.FLOAT: "numero",
+  **{tipo: "operador" for tipo in {**OPERATORS_2PLUS, **OPERATORS_1}.values()},
+  **{tipo: "delimitador" for tipo in DELIMS.values()},
+}
+
+def _regra_do_caractere(ch: str) -> str:
+  if ch == '"':
+    return "string"
+  if ch == "'":
+    return "char"
+  if ch.isdigit() or ch == ".":
+    return "numero"
+  return "erro"
+
+# contadores de uma regra (ramo do scanner) ou de um tipo de token
+@dataclass
+class RuleStats:
+  count: int = 0   # ocorrências
+  bytes: int = 0   # caracteres consumidos
+  ns: int = 0      # tempo acumulado, em nanossegundos
+
+  def _soma(self, tamanho: int, ns: int):
+    self.count += 1
+    self.bytes += tamanho
+    self.ns += ns
+
+# estatísticas de Scanner.scan_profiled: por regra (espaços, comentários, diretivas,
+# literais, identificadores, números, operadores, delimitadores, erros) e por TokenType.
+# os tempos incluem o custo de medir (perf_counter_ns a cada passo): servem para
+# comparar os ramos entre si, não para somar com o tempo de scan_all
+@dataclass
+class ScanStats:
+  regras: Dict[str, RuleStats] = field(default_factory=dict)
+  tipos: Dict[TokenType, RuleStats] = field(default_factory=dict)
+  total_ns: int = 0
+
+  def _registra(self, regra: str, tipo: Optional[TokenType], tamanho: int, ns: int):
+    entrada = self.regras.get(regra)
+    if entrada is None:
+      entrada = self.regras[regra] = RuleStats()
+    entrada._soma(tamanho, ns)
+    if tipo is not None:
+      entrada = self.tipos.get(tipo)
+      if entrada is None:
+        entrada = self.tipos[tipo] = RuleStats()
+      entrada._soma(tamanho, ns)
+
+  # relatório em texto: uma tabela por regra e outra por tipo, da mais cara para a mais barata
+  def report(self) -> str:
+    linhas = []
+    for titulo, tabela in (("REGRA", self.regras), ("TIPO", {t.name: e for t, e in self.tipos.items()})):
+      linhas.append(f"{titulo:<18} {'qtd':>10} {'bytes':>12} {'ms':>10} {'%tempo':>7} {'ns/byte':>8}")
+      for nome, e in sorted(tabela.items(), key=lambda x: -x[1].ns):
+        parte = e.ns / self.total_ns if self.total_ns else 0.0
+        por_byte = e.ns / e.bytes if e.bytes else 0.0
+        linhas.append(f"{nome:<18} {e.count:>10} {e.bytes:>12} {e.ns / 1e6:>10.2f} {parte:>7.1%} {por_byte:>8.1f}")
+      linhas.append("")
+    return "\n".join(linhas)
+
+  def print_report(self):
+    print("\n=== PERFIL DO SCANNER ===")
+    print(self.report(), end="")
+
 # =========================
 # SCANNER MANUAL
 # =========================
 class Scanner:
-  def __init__(self, codigo: str):
+  def __init__(self, codigo: str, engine: str = "manual"):
+    if engine not in ENGINES:
+      raise ValueError(f"engine desconhecido: {engine!r} (opções: {', '.join(ENGINES)})")
+    self.engine = engine
     self.codigo = codigo
     self.i = 0                     # índice atual no código
     self.tokens: List[Token] = []  # lista de tokens encontrados
-    self.symbols = {}  # type: Dict[str, Dict[str, int]]  # tabela de símbolos {nome: {id: int, count: int}}
-    self._next_sym_id = 1          # próximo id para identificadores (id1, id2...)
+    self.symbols = SymbolTable()   # tabela de símbolos (ids id1, id2... e contagens)
+    self._base = 0                 # posição de self.codigo[0] no texto completo (entrada em blocos)
+    self._blocos: Optional[Iterator[str]] = None  # próximos blocos de texto (None = entrada toda em memória)
+    self._proximo = getattr(self, ENGINES[engine])  # reconhecedor de um token do engine escolhido
+    self._inicio = 0               # posição (no texto completo) onde começou o último token reconhecido
+    self._linhas: Optional[array] = None  # posições de início de cada linha (montado sob demanda)
+
+  # cria um scanner que lê a entrada em blocos de tamanho limitado
+  # (arquivo pode ser um caminho, um arquivo texto ou um arquivo binário)
+  # o texto já analisado é descartado, então posicao precisa do índice de linhas
+  # montado durante a leitura: posicoes=True o liga (8 bytes por linha do arquivo)
+  @classmethod
+  def from_file(cls, arquivo: Union[str, "os.PathLike[str]", IO], chunk_size: int = 1 << 16,
+                encoding: str = "utf-8", engine: str = "manual", posicoes: bool = False) -> "Scanner":
+    sc = cls("", engine=engine)
+    if isinstance(arquivo, (str, os.PathLike)):
+      sc._blocos = _ler_blocos(open(arquivo, "rb"), chunk_size, encoding, fechar=True)
+    else:
+      sc._blocos = _ler_blocos(arquivo, chunk_size, encoding, fechar=False)
+    if posicoes:
+      sc._linhas = array("Q", [0])
+    return sc
+
+  # cria um scanner para um arquivo em disco; com mmap=True o arquivo é mapeado
+  # em memória e decodificado por janelas, sem ler o conteúdo para a memória do processo
+  @classmethod
+  def from_path(cls, caminho: Union[str, "os.PathLike[str]"], mmap: bool = False,
+                chunk_size: int = 1 << 20, encoding: str = "utf-8", engine: str = "manual",
+                posicoes: bool = False) -> "Scanner":
+    if not mmap:
+      return cls.from_file(caminho, chunk_size=chunk_size, encoding=encoding, engine=engine, posicoes=posicoes)
+    sc = cls("", engine=engine)
+    sc._blocos = _ler_blocos_mmap(caminho, chunk_size, encoding)
+    if posicoes:
+      sc._linhas = array("Q", [0])
+    return sc
+
+  # entrada em blocos: descarta o que já foi consumido e acrescenta os próximos blocos
+  # retorna False quando não há mais entrada
+  # lê pelo menos tanto quanto o texto mantido: um token maior que o bloco faz o
+  # buffer dobrar a cada recarga, então recopiar o texto mantido e casar de novo a
+  # partir do início do token custa O(tamanho do token) no total
+  def _fill(self) -> bool:
+    if self._blocos is None:
+      return False
+    resto = self.codigo[self.i:]
+    fim = self._base + len(self.codigo)  # posição (no texto completo) do próximo bloco
+    novos: List[str] = []
+    lidos = 0
+    while not novos or lidos < len(resto):
+      bloco = next(self._blocos, "")
+      if not bloco:
+        self._blocos = None
+        break
+      if self._linhas is not None:
+        _indexa_linhas(self._linhas, bloco, fim + lidos)
+      novos.append(bloco)
+      lidos += len(bloco)
+    if not novos:
+      return False
+    self._base += self.i
+    self.codigo = resto + "".join(novos)
+    self.i = 0
+    return True
+
+  # garante n caracteres disponíveis a partir de self.i (se a entrada tiver)
+  def _garante(self, n: int) -> bool:
+    while self.i + n > len(self.codigo):
+      if not self._fill():
+        return False
+    return True
 
   # olhar caractere atual sem consumir
   def _peek(self) -> str:
-    return self.codigo[self.i] if self.i < len(self.codigo) else "\0"
+    if self.i < len(self.codigo) or self._garante(1):
+      return self.codigo[self.i]
+    return "\0"
 
   # olhar dois caracteres (para operadores de 2 chars)
   def _peek2(self) -> str:
-    if self.i + 1 < len(self.codigo):
+    if self.i + 1 < len(self.codigo) or self._garante(2):
       return self.codigo[self.i] + self.codigo[self.i + 1]
     return "\0\0"
 
+  # olhar o caractere k posições à frente sem consumir
+  def _olha(self, k: int) -> str:
+    if self.i + k < len(self.codigo) or self._garante(k + 1):
+      return self.codigo[self.i + k]
+    return "\0"
+
+  # casa o padrão em self.i sem consumir; na entrada em blocos, um match que chega ao
+  # fim do texto disponível pode continuar no próximo bloco: lê mais e casa de novo
+  # (self.i fica no início do token, então _fill preserva o token inteiro)
+  def _casa(self, padrao: "re.Pattern[str]") -> "re.Match[str]":
+    while True:
+      m = padrao.match(self.codigo, self.i)
+      if m.end() < len(self.codigo) or not self._fill():
+        return m
+
   # avança e retorna caractere atual
   def _advance(self) -> str:
     ch = self._peek()
@@ -149,203 +973,765 @@ class Scanner:
   def _is_ident_part(ch: str) -> bool:
     return ch.isalnum() or ch == "_"
 
-  # emite um identificador (gera idN e atualiza tabela de símbolos com contagem)
-  def _emit_id(self, name: str):
-    if name not in self.symbols:
-      self.symbols[name] = {"id": self._next_sym_id, "count": 1}
-      self._next_sym_id += 1
-    else:
-      self.symbols[name]["count"] += 1
-    sym_id = self.symbols[name]["id"]
-    self.tokens.append(Token(TokenType.ID, f"id{sym_id}"))
+  # tabela de símbolos; trocar a tabela (ex.: continuar a de outro scanner) passa a
+  # consultar o índice de nomes dela. Um dict {nome: {"id", "count"}} é convertido (cópia)
+  @property
+  def symbols(self) -> SymbolTable:
+    return self._symbols
 
-  # função principal: percorre todo o código e gera lista de tokens
-  def scan_all(self) -> List[Token]:
+  @symbols.setter
+  def symbols(self, tabela: Mapping[str, Mapping[str, int]]):
+    if not isinstance(tabela, SymbolTable):
+      tabela = SymbolTable(tabela)
+    # tabela de consulta única: o próprio índice de nomes da tabela, com as palavras-chave
+    # palavra-chave → lexema compartilhado (str); identificador → posição na tabela.
+    # Reserva antes de trocar: uma tabela com palavra-chave como símbolo é recusada
+    # e o scanner continua com a tabela anterior
+    tabela._reserva(_KEYWORDS_LEXEMA)
+    self._symbols = tabela
+    self._palavras = tabela._posicao
+    _estende_lexemas_id(tabela.next_id)
+
+  # emite um identificador (gera idN e atualiza tabela de símbolos com contagem);
+  # entrada é o que a consulta em _palavras já encontrou (None para nome novo)
+  def _emit_id(self, name: str, entrada: Optional[int]) -> Token:
+    if entrada is None:
+      return Token(TokenType.ID, _LEXEMAS_ID[self._symbols._primeira_ocorrencia(name)])
+    return Token(TokenType.ID, _LEXEMAS_ID[self._symbols._ocorrencia(entrada)])
+
+  # consome uma sequência de espaços em branco (isspace) de uma vez
+  def _pula_espacos(self):
+    while True:
+      self.i = _ESPACOS.match(self.codigo, self.i).end()
+      if self.i < len(self.codigo) or not self._fill():
+        return
+
+  # consome um comentário de linha (// ... até o \n, inclusive; para antes de um \0)
+  def _pula_comentario_linha(self):
+    self.i += 2  # //
+    while True:
+      codigo = self.codigo
+      fim = codigo.find("\n", self.i)
+      nul = codigo.find("\0", self.i, fim if fim >= 0 else len(codigo))
+      if nul >= 0:
+        self.i = nul
+        return
+      if fim >= 0:
+        self.i = fim + 1
+        return
+      self.i = len(codigo)  # a linha continua no próximo bloco
+      if not self._fill():
+        return
 
-    while self.i < len(self.codigo):
+  # consome um comentário de bloco (/* ... */); não fechado, vai até o \0 ou o fim da entrada
+  def _pula_comentario_bloco(self):
+    self.i += 2  # /*
+    while True:
+      codigo = self.codigo
+      fim = codigo.find("*/", self.i)
+      nul = codigo.find("\0", self.i, fim if fim >= 0 else len(codigo))
+      if nul >= 0:
+        self.i = nul  # erro: não fechado
+        return
+      if fim >= 0:
+        self.i = fim + 2
+        return
+      # o "*/" pode estar dividido entre dois blocos: guarda o último caractere
+      self.i = max(self.i, len(codigo) - 1)
+      if not self._fill():
+        self.i = len(self.codigo)  # erro: não fechado
+        return
+
+  # pula espaços e comentários a partir de self.i; retorna se avançou
+  def _pula_ignorados(self) -> bool:
+    antes = self._base + self.i
+    while True:
       ch = self._peek()
+      if ch.isspace():
+        self._pula_espacos()
+      elif ch == "/" and self._peek2() == "//":
+        self._pula_comentario_linha()
+      elif ch == "/" and self._peek2() == "/*":
+        self._pula_comentario_bloco()
+      else:
+        return self._base + self.i != antes
+
+  # reconhece o próximo token a partir de self.i (pulando espaços e comentários)
+  # retorna None quando a entrada termina
+  def _scan_token(self) -> Optional[Token]:
+
+    while self.i < len(self.codigo) or self._fill():
+      ch = self._peek()
+      self._inicio = self._base + self.i
 
       # ignora espaços em branco
       if ch.isspace():
-        self._advance()
+        self._pula_espacos()
         continue
 
       # ignora comentários de linha (// ...)
       if ch == '/' and self._peek2() == '//':
-        self._advance()  # /
-        self._advance()  # /
-        while self._peek() not in '\n\0':
-          self._advance()
-        if self._peek() == '\n':
-          self._advance()
+        self._pula_comentario_linha()
         continue
 
       # ignora comentários de bloco (/* ... */)
       if ch == '/' and self._peek2() == '/*':
-        self._advance()  # /
-        self._advance()  # *
-        while True:
-          if self._peek() == '\0':
-            break  # erro: não fechado
-          if self._peek() == '*' and self.codigo[self.i+1:self.i+2] == '/':
-            self._advance()  # *
-            self._advance()  # /
-            break
-          self._advance()
+        self._pula_comentario_bloco()
         continue
 
       # Diretiva de pré-processador (linha começando com # em qualquer lugar da linha)
       if ch == "#":
-        lex = self._advance()
-        while self._peek() not in "\n\0":
-          lex += self._advance()
-        self.tokens.append(Token(TokenType.PP_DIRECTIVE, lex.strip()))
-        if self._peek() == '\n':
-          self._advance()
-        continue
+        m = self._casa(_DIRETIVA)
+        self.i = m.end()
+        return Token(TokenType.PP_DIRECTIVE, m.group().strip())
 
-      # Literais de string
-      if ch == '"':
-        lex = self._advance()
-        closed = False
-        while self._peek() != '\0':
-          c = self._advance()
-          lex += c
-          if c == '\n':
-            lex += c
-            continue
-          if c == '\\' and self._peek() != '\0':
-            lex += self._advance()
-            continue
-          if c == '"' and (len(lex) < 2 or lex[-2] != '\\'):
-            closed = True
-            break
-          if c == '\n':
-            break
-        if closed:
-          self.tokens.append(Token(TokenType.STRING, lex))
-        else:
-          self.tokens.append(Token(TokenType.ERRO, lex))
-        continue
-
-      # Literais de caractere
-      if ch == "'":
-        lex = self._advance()
-        closed = False
-        while self._peek() != '\0':
-          c = self._advance()
-          lex += c
-          if c == '\n':
-            lex += c
-            continue
-          if c == '\\' and self._peek() != '\0':
-            lex += self._advance()
-            continue
-          if c == "'" and (len(lex) < 2 or lex[-2] != '\\'):
-            closed = True
-            break
-          if c == '\n':
-            break
-        if closed:
-          self.tokens.append(Token(TokenType.CHAR, lex))
-        else:
-          self.tokens.append(Token(TokenType.ERRO, lex))
-        continue
+      # Literais de string e de caractere (sem fechamento viram ERRO)
+      if ch == '"' or ch == "'":
+        m = self._casa(_LITERAL[ch])
+        self.i = m.end()
+        lex = m.group()
+        if "\n" in lex:
+          lex = _duplica_quebras(lex)
+        if m.group("FIM") is None:
+          return Token(TokenType.ERRO, lex)
+        return Token(TokenType.STRING if ch == '"' else TokenType.CHAR, lex)
 
       # Identificadores e palavras-chave
       if self._is_ident_start(ch):
-        lex = self._advance()
-        while self._is_ident_part(self._peek()):
-          lex += self._advance()
-        if lex in KEYWORDS:
-          self.tokens.append(Token(TokenType.KEYWORD, lex))
-        else:
-          self._emit_id(lex)
-        continue
+        m = self._casa(_PARTE_IDENT)
+        self.i = m.end()
+        lex = m.group()
+        # uma única consulta decide entre palavra-chave e símbolo
+        entrada = self._palavras.get(lex)
+        if entrada.__class__ is str:
+          return Token(TokenType.KEYWORD, entrada)
+        return self._emit_id(lex, entrada)
 
-      # Números
-      if ch.isdigit() or (ch == '.' and self._peek( ) and self._peek() != '\0' and self._peek().isdigit()):
-        lex = ''
-        is_float = False
-        if ch == '.':
-          lex += self._advance()
-          is_float = True
-        else:
-          lex += self._advance()
-          while self._peek().isdigit():
-            lex += self._advance()
+      # Números (".5" é DOT seguido de NUM); k conta os caracteres já reconhecidos
+      if ch.isdigit():
+        k = 1
+        while self._olha(k).isdigit():
+          k += 1
+        tipo = TokenType.NUM
         # Float
-        if self._peek() == ".":
-          lookahead = self.codigo[self.i+1] if self.i+1 < len(self.codigo) else "\0"
-          if lookahead.isdigit():
-            lex += self._advance()  # pega o ponto
-            is_float = True
-            while self._peek().isdigit():
-              lex += self._advance()
-        if self._peek() == ",":
-          lex += self._advance()
-          while self._peek().isdigit():
-            lex += self._advance()
-          self.tokens.append(Token(TokenType.ERRO, lex))
-          continue
+        if self._olha(k) == "." and self._olha(k + 1).isdigit():
+          k += 2  # pega o ponto e o primeiro dígito
+          tipo = TokenType.FLOAT
+          while self._olha(k).isdigit():
+            k += 1
+        if self._olha(k) == ",":
+          k += 1
+          while self._olha(k).isdigit():
+            k += 1
+          tipo = TokenType.ERRO
         # se após número vier letra/_ → erro único (ex: "8a")
-        if self._is_ident_part(self._peek()):
-          while self._is_ident_part(self._peek()):
-            lex += self._advance()
-          self.tokens.append(Token(TokenType.ERRO, lex))
-        else:
-          if is_float:
-            self.tokens.append(Token(TokenType.FLOAT, lex))
-          else:
-            self.tokens.append(Token(TokenType.NUM, lex))
-        continue
+        elif self._is_ident_part(self._olha(k)):
+          k += 1
+          while self._is_ident_part(self._olha(k)):
+            k += 1
+          tipo = TokenType.ERRO
+        lex = self.codigo[self.i:self.i + k]
+        self.i += k
+        return Token(tipo, lex)
 
       # Operadores (checa primeiro os de 3, depois 2 chars)
+      if self.i + 3 > len(self.codigo):
+        self._garante(3)
       three = self.codigo[self.i:self.i+3]
-      if three in OPERATORS_2PLUS:
-        self.tokens.append(Token(OPERATORS_2PLUS[three], three))
-        self.i += 3
-        continue
-      two = self._peek2()
-      if two in OPERATORS_2PLUS:
-        self.tokens.append(Token(OPERATORS_2PLUS[two], two))
+      op = _OP_2PLUS.get(three)
+      if op is not None:
+        self.i += len(three)
+        return Token(op[0], op[1])
+      op = _OP_2PLUS.get(self._peek2())
+      if op is not None:
         self.i += 2
-        continue
+        return Token(op[0], op[1])
       if ch in OPERATORS_1:
-        self.tokens.append(Token(OPERATORS_1[ch], self._advance()))
-        continue
+        return Token(OPERATORS_1[ch], self._advance())
 
       # Delimitadores
       if ch in DELIMS:
-        self.tokens.append(Token(DELIMS[ch], self._advance()))
-        continue
+        return Token(DELIMS[ch], self._advance())
 
       # Qualquer outro caractere é erro
-      self.tokens.append(Token(TokenType.ERRO, self._advance()))
+      return Token(TokenType.ERRO, self._advance())
+
+    return None
+
+  # engine "regex": reconhece o próximo token com um único padrão mestre (re.match na posição)
+  # caracteres fora do ASCII no início de identificadores/números são delegados ao
+  # scanner manual, que aplica as regras Unicode de isalpha/isdigit
+  def _scan_token_regex(self) -> Optional[Token]:
+    match = _PADRAO_MESTRE.match
+    while True:
+      m = match(self.codigo, self.i)
+      fim = m.end()
+      # entrada em blocos: o token pode continuar no próximo bloco (ou depender de lookahead).
+      # espaços e comentários longos antes dele são pulados pelos laços do scanner
+      # manual, que seguem de bloco em bloco, em vez de casar de novo desde self.i
+      if fim + 2 > len(self.codigo) and self._blocos is not None:
+        if self._pula_ignorados() or self._fill():
+          continue
+      grupo = m.lastgroup
+
+      # só restavam espaços em branco e comentários
+      if grupo is None:
+        self.i = fim
+        return None
+
+      self._inicio = self._base + m.start(grupo)
+      lex = m.group(grupo)
+      if grupo == "ID":
+        self.i = fim
+        entrada = self._palavras.get(lex)
+        if entrada.__class__ is str:
+          return Token(TokenType.KEYWORD, entrada)
+        return self._emit_id(lex, entrada)
+
+      if grupo == "OP":
+        self.i = fim
+        tipo, lex = _OP_TODOS[lex]
+        return Token(tipo, lex)
+
+      if grupo == "NUM":
+        if not self.codigo[m.start(grupo):fim + 2].isascii():
+          self.i = m.start(grupo)
+          return self._scan_token()
+        self.i = fim
+        if m.group("NUM_VIRGULA") is not None or m.group("NUM_ERRO") is not None:
+          return Token(TokenType.ERRO, lex)
+        if m.group("NUM_PONTO") is not None:
+          return Token(TokenType.FLOAT, lex)
+        return Token(TokenType.NUM, lex)
+
+      self.i = fim
+      if grupo == "PP":
+        return Token(TokenType.PP_DIRECTIVE, lex.strip())
+
+      if grupo == "STRING" or grupo == "CHAR":
+        fechado = m.group(grupo + "_FIM") is not None
+        if "\n" in lex:
+          lex = _duplica_quebras(lex)
+        if not fechado:
+          return Token(TokenType.ERRO, lex)
+        return Token(TokenType.STRING if grupo == "STRING" else TokenType.CHAR, lex)
+
+      # qualquer outro caractere é erro (fora do ASCII pode ser letra/dígito Unicode)
+      if not lex.isascii():
+        self.i = m.start(grupo)
+        return self._scan_token()
+      return Token(TokenType.ERRO, lex)
+
+  # engine "afd": autômato finito determinístico guiado por tabelas planas; o laço
+  # interno faz só a consulta da classe do caractere e da transição
+  def _scan_token_afd(self) -> Optional[Token]:
+    classe, trans, aceita = _AFD_CLASSE, _AFD_TRANS, _AFD_ACEITA
+    retoma = None  # (estado, j, ação, fim) relativos ao início do token, guardados numa recarga
+    while self.i < len(self.codigo) or self._fill():
+      codigo = self.codigo
+      n = len(codigo)
+      ini = self.i
+      if retoma is None:
+        j = fim = ini
+        st = _AFD_INICIO
+        acao = _A_NENHUMA
+      else:
+        st, j, acao, fim = retoma
+        j += ini
+        fim += ini
+        retoma = None
+      # maximal munch: avança enquanto houver transição, lembrando a última aceitação
+      # (o estado morto não tem transições: retomado, para de imediato)
+      while j < n:
+        o = ord(codigo[j])
+        st = trans[st + (classe[o] if o < 128 else _C_NAO_ASCII)]
+        if not st:
+          break
+        j += 1
+        if aceita[st]:
+          acao = aceita[st]
+          fim = j
+      # entrada em blocos: o token pode continuar no próximo bloco (ou depender de
+      # lookahead); _fill mantém o texto desde o início do token, então o autômato
+      # continua de onde parou em vez de recomeçar
+      if (j >= n or fim + 2 > n) and self._blocos is not None:
+        retoma = (st, j - ini, acao, fim - ini)
+        if self._fill():
+          continue
+        retoma = None
+
+      # espaços em branco e comentários
+      if acao == _A_PULA:
+        self.i = fim
+        continue
+
+      self._inicio = self._base + ini
+      lex = codigo[ini:fim]
+      if acao == _A_ID or acao == _A_NUM or acao == _A_FLOAT or acao == _A_ERRO_NUM:
+        # letras/dígitos Unicode ficam com as regras do scanner manual
+        if not codigo[ini:fim + 2].isascii():
+          return self._scan_token()
+        self.i = fim
+        if acao == _A_ID:
+          entrada = self._palavras.get(lex)
+          if entrada.__class__ is str:
+            return Token(TokenType.KEYWORD, entrada)
+          return self._emit_id(lex, entrada)
+        if acao == _A_NUM:
+          return Token(TokenType.NUM, lex)
+        if acao == _A_FLOAT:
+          return Token(TokenType.FLOAT, lex)
+        return Token(TokenType.ERRO, lex)
+
+      if acao == _A_ERRO and not lex.isascii():
+        return self._scan_token()
+      self.i = fim
+      if acao == _A_OP:
+        tipo, lex = _OP_TODOS[lex]
+        return Token(tipo, lex)
+      if acao == _A_PP:
+        return Token(TokenType.PP_DIRECTIVE, lex.strip())
+      if acao == _A_STRING or acao == _A_CHAR or acao == _A_ERRO_LIT:
+        if "\n" in lex:
+          lex = _duplica_quebras(lex)
+        if acao == _A_STRING:
+          return Token(TokenType.STRING, lex)
+        if acao == _A_CHAR:
+          return Token(TokenType.CHAR, lex)
+      return Token(TokenType.ERRO, lex)
+
+    return None
 
+  # gera os tokens sob demanda, sem acumulá-los em self.tokens
+  # (a tabela de símbolos é atualizada à medida que os IDs aparecem)
+  def iter_tokens(self) -> Iterator[Token]:
+    while True:
+      tok = self._proximo()
+      if tok is None:
+        break
+      tok.inicio = self._inicio
+      yield tok
     # fim de arquivo
-    self.tokens.append(Token(TokenType.EOF, ""))
+    yield Token(TokenType.EOF, "", self._base + self.i)
+
+  # função principal: percorre todo o código e gera lista de tokens
+  def scan_all(self) -> List[Token]:
+    self.tokens.extend(self.iter_tokens())
     return self.tokens
 
+  # varre tudo gravando os tokens em colunas (arrays tipados) em vez de objetos Token
+  def scan_columns(self) -> "TokenColumns":
+    cols = TokenColumns(self.codigo if self._blocos is None else None, self.symbols)
+    tipos, inicios, tamanhos, simbolos = cols.tipos.append, cols.inicios.append, cols.tamanhos.append, cols.simbolos.append
+    proximo = self._proximo
+    while True:
+      tok = proximo()
+      if tok is None:
+        break
+      ini = self._inicio
+      tipos(tok.tipo.value)
+      inicios(ini)
+      tamanhos(self._base + self.i - ini)
+      simbolos(int(tok.lexema[2:]) if tok.tipo is TokenType.ID else 0)
+    # fim de arquivo
+    tipos(TokenType.EOF.value)
+    inicios(self._base + self.i)
+    tamanhos(0)
+    simbolos(0)
+    return cols
+
+  # varredura instrumentada: produz os mesmos tokens que scan_all com o engine
+  # manual, medindo contagem, caracteres e tempo de cada regra e de cada TokenType.
+  # é um laço separado (o caminho normal não tem nenhuma verificação a mais): aqui
+  # o ramo é classificado pelo primeiro caractere, espaços e comentários são
+  # consumidos um trecho por vez e o restante é delegado a _scan_token
+  def scan_profiled(self) -> ScanStats:
+    stats = ScanStats()
+    relogio = time.perf_counter_ns
+    registra = stats._registra
+    inicio_total = relogio()
+    while self.i < len(self.codigo) or self._fill():
+      ch = self._peek()
+      antes = self._base + self.i
+      t0 = relogio()
+      tok = None
+      if ch.isspace():
+        regra = "espacos"
+        self._pula_espacos()
+      elif ch == "/" and self._peek2() == "//":
+        regra = "comentario_linha"
+        self._pula_comentario_linha()
+      elif ch == "/" and self._peek2() == "/*":
+        regra = "comentario_bloco"
+        self._pula_comentario_bloco()
+      else:
+        tok = self._scan_token()
+        tok.inicio = self._inicio
+        self.tokens.append(tok)
+        regra = _REGRA_POR_TIPO.get(tok.tipo) or _regra_do_caractere(ch)
+      registra(regra, tok.tipo if tok is not None else None, self._base + self.i - antes, relogio() - t0)
+    self.tokens.append(Token(TokenType.EOF, "", self._base + self.i))
+    stats.total_ns = relogio() - inicio_total
+    return stats
+
+  # linha e coluna (a partir de 1) de um token ou posição, por busca binária no
+  # índice de inícios de linha, montado só na primeira consulta (nada é contado no laço principal).
+  # posições e colunas contam caracteres do texto decodificado, não bytes
+  # na entrada em blocos o índice só existe com posicoes=True (ou se o texto inteiro
+  # coube num bloco)
+  def posicao(self, alvo: Union[Token, int]) -> Tuple[int, int]:
+    pos = alvo.inicio if isinstance(alvo, Token) else alvo
+    if self._linhas is None:
+      if self._base or self._blocos is not None:
+        raise ValueError("entrada lida em blocos sem índice de linhas: use from_file/from_path com posicoes=True")
+      self._linhas = array("Q", [0])
+      _indexa_linhas(self._linhas, self.codigo, self._base)
+    linha = bisect_right(self._linhas, pos)
+    return linha, pos - self._linhas[linha - 1] + 1
+
+  # tokens de erro léxico com suas posições (linha, coluna)
+  def errors(self) -> List[Tuple[Token, int, int]]:
+    return [(t, *self.posicao(t)) for t in self.tokens if t.tipo is TokenType.ERRO]
+
+  # impressão dos erros léxicos
+  def print_errors(self):
+    print("\n=== ERROS LÉXICOS ===")
+    for t, linha, coluna in self.errors():
+      print(f"linha {linha}, coluna {coluna}: {t.lexema!r}")
+
   # impressão simples da lista de tokens
   def print_tokens(self):
-    print("\n=== LISTA DE TOKENS ===")
-    for t in self.tokens:
-      print(f"{t.tipo.name:<7}  {t.lexema}")
+    sys.stdout.write("\n=== LISTA DE TOKENS ===\n")
+    self.write_tokens(sys.stdout)
 
   # impressão da tabela de símbolos
   def print_symbol_table(self, sort_by_name: bool = False):
-    print("\n=== TABELA DE SÍMBOLOS ===")
-    items = list(self.symbols.items())
-    if sort_by_name:
-      items.sort(key=lambda x: x[0])  # ordena alfabeticamente
-    for name, data in items:
-      print(f"id{data['id']:<3}  {name:<15}  ocorrências: {data['count']}")
+    sys.stdout.write("\n=== TABELA DE SÍMBOLOS ===\n")
+    self.write_symbol_table(sys.stdout, sort_by_name)
+
+  # tokens já analisados (scan_all) em stream de texto ou binário; ver write_tokens
+  def write_tokens(self, stream: IO, formato: str = "texto"):
+    write_tokens(stream, self.tokens, formato)
+
+  def write_symbol_table(self, stream: IO, sort_by_name: bool = False, formato: str = "texto"):
+    write_symbol_table(stream, self.symbols, sort_by_name, formato)
+
+# =========================
+# RE-ANÁLISE INCREMENTAL
+# =========================
+# mantém tokens e tabela de símbolos de um buffer que é editado aos poucos
+# (ex.: editor); cada edição re-analisa só a vizinhança do trecho alterado.
+# os ids dos símbolos são estáveis entre edições: nomes novos recebem o próximo id
+# livre e nomes cuja contagem chega a zero saem da tabela (o id não é reaproveitado)
+#
+# o custo de uma edição não cresce com o arquivo:
+# - o texto fica em pedaços de até PEDACO caracteres; a edição refaz só os pedaços
+#   tocados e o scanner lê a partir do ponto de reinício como entrada em blocos
+# - as posições dos tokens seguem a ideia do gap buffer: os tokens a partir de
+#   _lacuna guardam inicio/fim defasados de _desloc. Uma edição só corrige os tokens
+#   entre a lacuna e o ponto editado (perto um do outro, em edições seguidas) e
+#   soma o seu delta a _desloc. janela lê um trecho de tokens corrigindo as posições
+#   na cópia devolvida (custo do trecho); tokens corrige a lista inteira (custo do arquivo)
+# - um único Scanner serve a todas as edições
+class IncrementalScanner:
+  PEDACO = 16384
+
+  def __init__(self, codigo: str = "", engine: str = "manual"):
+    self.engine = engine
+    self._pedacos: List[str] = [""]      # texto em pedaços (só o texto vazio tem pedaço vazio)
+    self._inicios_pedacos: List[int] = [0]  # posição de cada pedaço no texto
+    self._tamanho = 0
+    self._tokens: List[Token] = [Token(TokenType.EOF, "", 0)]
+    self._fins: List[int] = [0]          # posição logo após cada token
+    self._lacuna = 0                     # primeiro token com posições defasadas
+    self._desloc = 0                     # defasagem das posições a partir de _lacuna
+    self._sc = Scanner("", engine=engine)
+    self.symbols = self._sc.symbols
+    self.edit(0, 0, codigo)
+
+  # texto atual (montado a cada leitura)
+  @property
+  def codigo(self) -> str:
+    return "".join(self._pedacos)
+
+  # todos os tokens atuais, com as posições (inicio) corrigidas; corrige a lista
+  # inteira a partir da lacuna: para ler só o que uma edição mudou, use janela
+  @property
+  def tokens(self) -> List[Token]:
+    self._move_lacuna(len(self._tokens))
+    return self._tokens
+
+  # tokens[ini:fim] com as posições corrigidas, em custo proporcional ao trecho;
+  # tokens depois da lacuna vêm como cópias (o original guarda a posição defasada)
+  # ex.: primeiro, _, inseridos = inc.edit(...); inc.janela(primeiro, primeiro + inseridos)
+  def janela(self, ini: int, fim: int) -> List[Token]:
+    tokens, g, d = self._tokens, self._lacuna, self._desloc
+    ini, fim, _ = slice(ini, fim).indices(len(tokens))
+    if not d or fim <= g:
+      return tokens[ini:fim]
+    meio = max(ini, g)
+    return tokens[ini:meio] + [Token(t.tipo, t.lexema, t.inicio + d) for t in tokens[meio:fim]]
+
+  def __len__(self) -> int:
+    return len(self._tokens)
+
+  # substitui codigo[inicio:fim] por texto e atualiza os tokens
+  # retorna (índice do primeiro token alterado, tokens removidos, tokens inseridos)
+  def edit(self, inicio: int, fim: int, texto: str) -> Tuple[int, int, int]:
+    if not 0 <= inicio <= fim <= self._tamanho:
+      raise ValueError(f"intervalo de edição inválido: [{inicio}, {fim}) em {self._tamanho} caracteres")
+    delta = len(texto) - (fim - inicio)
+    self._substitui_texto(inicio, fim, texto)
+    fim_novo = inicio + len(texto)
+    tokens, fins = self._tokens, self._fins
+    n_antigos = len(tokens) - 1  # sem o EOF
+
+    # reinicia após o último token que termina 2+ caracteres antes da edição
+    # (para decidir onde um token termina o scanner olha até 2 caracteres à frente);
+    # antes da lacuna as posições estão corretas, depois estão defasadas de _desloc
+    alvo = inicio - 2
+    g = min(self._lacuna, n_antigos)
+    r = bisect_right(fins, alvo, 0, g)
+    if r == g:
+      r = bisect_right(fins, alvo - self._desloc, g, n_antigos)
+    self._move_lacuna(r)
+    desloc = self._desloc + delta  # posição nova de um token antigo j >= r: tokens[j].inicio + desloc
+    sc = self._sc
+    self._posiciona(sc, fins[r - 1] if r else 0)
+
+    # re-analisa até um token novo coincidir com um antigo (mesma posição já
+    # deslocada, mesmo fim e mesmo conteúdo) depois do trecho editado
+    novos, novos_fins = [], []
+    j = r
+    convergiu = False
+    while True:
+      tok = sc._proximo()
+      if tok is None:
+        break
+      ini = tok.inicio = sc._inicio
+      fim_tok = sc._base + sc.i
+      if ini >= fim_novo:
+        while j < n_antigos and tokens[j].inicio + desloc < ini:
+          j += 1
+        if (j < n_antigos and tokens[j].inicio + desloc == ini and fins[j] + desloc == fim_tok
+            and tokens[j] == tok):
+          convergiu = True
+          break
+      novos.append(tok)
+      novos_fins.append(fim_tok)
+    sc._blocos = None
+
+    if convergiu:
+      # o token de convergência já existia: desfaz a contagem feita ao re-analisá-lo
+      if tok.tipo is TokenType.ID:
+        self._descontar(tok.lexema)
+    else:
+      j = n_antigos + 1  # substitui também o EOF
+      novos.append(Token(TokenType.EOF, "", self._tamanho))
+      novos_fins.append(self._tamanho)
+    for antigo in tokens[r:j]:
+      if antigo.tipo is TokenType.ID:
+        self._descontar(antigo.lexema)
+
+    tokens[r:j] = novos
+    fins[r:j] = novos_fins
+    self._lacuna = r + len(novos)
+    self._desloc = desloc if self._lacuna < len(tokens) else 0  # 0: nenhum token defasado
+    return r, j - r, len(novos)
+
+  # leva a lacuna ao token r, corrigindo (ou defasando) só os tokens entre as duas
+  def _move_lacuna(self, r: int):
+    g, d = self._lacuna, self._desloc
+    if d and r > g:
+      for t in self._tokens[g:r]:
+        t.inicio += d
+      self._fins[g:r] = [x + d for x in self._fins[g:r]]
+    elif d and r < g:
+      for t in self._tokens[r:g]:
+        t.inicio -= d
+      self._fins[r:g] = [x - d for x in self._fins[r:g]]
+    self._lacuna = r
+    if r == len(self._tokens):
+      self._desloc = 0
+
+  # troca texto[inicio:fim] refazendo só os pedaços tocados (um pedaço que fica
+  # pequeno é juntado ao seguinte)
+  def _substitui_texto(self, inicio: int, fim: int, texto: str):
+    pedacos, inicios = self._pedacos, self._inicios_pedacos
+    k1 = bisect_right(inicios, inicio) - 1
+    k2 = bisect_right(inicios, fim) - 1
+    s1 = inicios[k1]
+    novo = pedacos[k1][:inicio - s1] + texto + pedacos[k2][fim - inicios[k2]:]
+    if len(novo) < self.PEDACO // 2 and k2 + 1 < len(pedacos):
+      k2 += 1
+      novo += pedacos[k2]
+    pedacos[k1:k2 + 1] = [novo[p:p + self.PEDACO] for p in range(0, len(novo), self.PEDACO)]
+    if not pedacos:
+      pedacos.append("")
+    inicios[k1:] = list(accumulate(map(len, pedacos[k1:]), initial=s1))[:-1]
+    self._tamanho += len(texto) - (fim - inicio)
+
+  # prepara o scanner para ler o texto a partir da posição pos, pedaço a pedaço
+  def _posiciona(self, sc: Scanner, pos: int):
+    k = bisect_right(self._inicios_pedacos, pos) - 1
+    sc.codigo = self._pedacos[k][pos - self._inicios_pedacos[k]:]
+    sc.i = 0
+    sc._base = pos
+    sc._blocos = islice(self._pedacos, k + 1, None)
+
+  # decrementa a contagem do símbolo idN (e o remove ao chegar a zero)
+  def _descontar(self, lexema: str):
+    self.symbols.decrement(int(lexema[2:]))
+
+# =========================
+# LINHA DE COMANDO
+# =========================
+# python -m lexer_manual [entradas...]: arquivos, globs, diretórios (procurados
+# recursivamente por --ext) e "-" para a entrada padrão; a saída é escrita à medida
+# que cada arquivo é analisado. sem entradas, mostra os exemplos abaixo
+def _expande_entradas(entradas: List[str], extensoes: Tuple[str, ...]) -> Iterator[str]:
+  for entrada in entradas:
+    if entrada == "-":
+      yield entrada
+    elif os.path.isdir(entrada):
+      for raiz, dirs, arquivos in os.walk(entrada):
+        dirs.sort()
+        for nome in sorted(arquivos):
+          if nome.endswith(extensoes):
+            yield os.path.join(raiz, nome)
+    elif any(c in entrada for c in "*?["):
+      for caminho in sorted(glob.iglob(entrada, recursive=True)):
+        if os.path.isdir(caminho):
+          yield from _expande_entradas([caminho], extensoes)
+        else:
+          yield caminho
+    else:
+      yield entrada
+
+def _cabecalho(nome: str) -> str:
+  return f"\n{'='*40}\nArquivo: {nome}\n{'='*40}\n\n=== LISTA DE TOKENS ===\n"
+
+# analisa uma entrada e escreve tokens (e tabela de símbolos) em saida, em blocos;
+# os tokens nunca ficam todos em memória
+def _lex_entrada(caminho: str, saida: IO, formato: str, engine: str, encoding: str, simbolos: bool):
+  if caminho == "-":
+    sc = Scanner.from_file(sys.stdin.buffer, encoding=encoding, engine=engine)
+  else:
+    sc = Scanner.from_path(caminho, encoding=encoding, engine=engine)
+  arquivo = None if formato == "texto" else caminho
+  if formato == "texto":
+    saida.write(_cabecalho(caminho))
+  write_tokens(saida, sc.iter_tokens(), formato, arquivo=arquivo)
+  if simbolos:
+    if formato == "texto":
+      saida.write("\n=== TABELA DE SÍMBOLOS ===\n")
+    write_symbol_table(saida, sc.symbols, formato=formato, arquivo=arquivo)
+
+# tarefa de um processo do --jobs: escreve a saída formatada do arquivo num arquivo
+# temporário (em blocos, como na análise sequencial) e devolve o caminho dele; o
+# processo principal copia esse arquivo para a saída em blocos e o apaga, então nenhum
+# dos dois processos guarda a saída inteira de um arquivo em memória
+def _lex_formatado(caminho: str, formato: str, engine: str, encoding: str, simbolos: bool) -> str:
+  fd, temporario = tempfile.mkstemp(prefix="lexer_manual_", suffix=".out")
+  try:
+    with open(fd, "w", encoding="utf-8", newline="") as saida:
+      _lex_entrada(caminho, saida, formato, engine, encoding, simbolos)
+  except BaseException:
+    os.remove(temporario)
+    raise
+  return temporario
+
+# copia a saída de uma tarefa do --jobs e apaga o arquivo temporário
+def _copia_formatado(temporario: str, saida: IO):
+  try:
+    with open(temporario, encoding="utf-8", newline="") as f:
+      shutil.copyfileobj(f, saida, 1 << 16)
+  finally:
+    os.remove(temporario)
+
+# tipos dos argumentos da linha de comando: erros viram mensagens do argparse
+def _arg_encoding(texto: str) -> str:
+  try:
+    codecs.lookup(texto)
+  except LookupError:
+    raise argparse.ArgumentTypeError(f"codificação desconhecida: {texto!r}") from None
+  return texto
+
+def _arg_jobs(texto: str) -> int:
+  try:
+    jobs = int(texto)
+  except ValueError:
+    jobs = -1
+  if jobs < 0:
+    raise argparse.ArgumentTypeError(f"esperado um inteiro >= 0, não {texto!r}")
+  return jobs
+
+def _erro(caminho: str, exc: Exception):
+  sys.stderr.write(f"lexer_manual: {caminho}: {exc}\n")
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(prog="python -m lexer_manual",
+                                   description="Analisador léxico para uma linguagem semelhante a C.")
+  parser.add_argument("entradas", nargs="*",
+                      help='arquivos, globs ou diretórios; "-" lê da entrada padrão')
+  parser.add_argument("-f", "--formato", choices=FORMATOS, default="texto", help="formato da saída")
+  parser.add_argument("-e", "--engine", choices=sorted(ENGINES), default="manual")
+  parser.add_argument("-j", "--jobs", type=_arg_jobs, default=1,
+                      help="processos para analisar arquivos em paralelo (0 = nº de CPUs)")
+  parser.add_argument("-s", "--simbolos", action="store_true", help="inclui a tabela de símbolos de cada arquivo")
+  parser.add_argument("--ext", default=".c,.h", help="extensões procuradas em diretórios (padrão: .c,.h)")
+  parser.add_argument("--encoding", type=_arg_encoding, default="utf-8")
+  args = parser.parse_args(argv)
+  if not args.entradas:
+    _exemplos()
+    return 0
+
+  caminhos = _expande_entradas(args.entradas, tuple(args.ext.split(",")))
+  opcoes = (args.formato, args.engine, args.encoding, args.simbolos)
+  saida = sys.stdout
+  falhou = False
+  jobs = args.jobs or os.cpu_count() or 1
+  if jobs == 1:
+    for caminho in caminhos:
+      try:
+        _lex_entrada(caminho, saida, *opcoes)
+      except (OSError, UnicodeDecodeError) as exc:
+        _erro(caminho, exc)
+        falhou = True
+    return int(falhou)
+
+  # paralelo: janela limitada de tarefas em andamento, saída na ordem das entradas
+  janela = deque()
+  def escreve_proximo():
+    nonlocal falhou
+    caminho, futuro = janela.popleft()
+    try:
+      _copia_formatado(futuro.result(), saida)
+    except (OSError, UnicodeDecodeError) as exc:
+      _erro(caminho, exc)
+      falhou = True
+  with ProcessPoolExecutor(max_workers=jobs) as executor:
+    for caminho in caminhos:
+      if caminho == "-":  # a entrada padrão é lida no processo principal
+        while janela:
+          escreve_proximo()
+        try:
+          _lex_entrada(caminho, saida, *opcoes)
+        except (OSError, UnicodeDecodeError) as exc:
+          _erro(caminho, exc)
+          falhou = True
+        continue
+      janela.append((caminho, executor.submit(_lex_formatado, caminho, *opcoes)))
+      if len(janela) >= 2 * jobs:
+        escreve_proximo()
+    while janela:
+      escreve_proximo()
+  return int(falhou)
 
 # =========================
 # EXEMPLO DE USO
 # =========================
-if __name__ == "__main__":
+def _exemplos():
   codigo = """
   int a = 10;
   int b = 30;
@@ -403,4 +1789,7 @@ if __name__ == "__main__":
     sc = Scanner(cod)
     sc.scan_all()
     sc.print_tokens()
-    sc.print_symbol_table(sort_by_name=False)
\ No newline at end of file
+    sc.print_symbol_table(sort_by_name=False)
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,146 @@
+# Métricas do analisador léxico - Compiladores
+# acumula, ao longo de várias análises, arquivos, bytes, tokens, tokens de erro,
+# tempo (com histograma de latência) e tamanho da tabela de símbolos, e exporta no
+# formato texto do Prometheus (arquivo para o textfile collector ou endpoint HTTP local).
+# Vazão não é exportada como gauge (seria a média desde o início do processo); ela sai
+# dos contadores numa janela escolhida na consulta, ex.:
+#   rate(lexer_bytes_total[5m]) / rate(lexer_scan_duration_seconds_sum[5m])
+
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, List, Sequence, Union
+
+from lexer_manual import Scanner, Token, TokenType
+
+# limites (segundos) dos baldes do histograma de latência por análise
+BALDES_PADRAO = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _numero(valor: float) -> str:
+  if valor == float("inf"):
+    return "+Inf"
+  return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+# métricas acumuladas; seguro para uso por várias threads (ex.: servidor + analisadores)
+class LexerMetrics:
+  def __init__(self, baldes: Sequence[float] = BALDES_PADRAO, prefixo: str = "lexer"):
+    self.prefixo = prefixo
+    self.baldes = tuple(sorted(baldes))
+    self._trava = threading.Lock()
+    self.arquivos = 0
+    self.bytes = 0
+    self.tokens = 0
+    self.erros = 0          # tokens TokenType.ERRO
+    self.segundos = 0.0     # tempo total de análise
+    self.simbolos = 0       # tamanho da tabela de símbolos da última análise
+    self.simbolos_max = 0
+    self._contagens = [0] * (len(self.baldes) + 1)  # último balde: +Inf
+
+  # registra uma análise já feita
+  def observe(self, tamanho: int, tokens: int, erros: int, segundos: float, simbolos: int):
+    with self._trava:
+      self.arquivos += 1
+      self.bytes += tamanho
+      self.tokens += tokens
+      self.erros += erros
+      self.segundos += segundos
+      self.simbolos = simbolos
+      self.simbolos_max = max(self.simbolos_max, simbolos)
+      self._contagens[bisect_left(self.baldes, segundos)] += 1
+
+  # registra os tokens de uma análise (conta os ERRO)
+  def observe_tokens(self, tokens: Iterable[Token], tamanho: int, segundos: float, simbolos: int):
+    n = erros = 0
+    for t in tokens:
+      n += 1
+      if t.tipo is TokenType.ERRO:
+        erros += 1
+    self.observe(tamanho, n, erros, segundos, simbolos)
+
+  # analisa um código-fonte com scan_all, registrando a análise
+  def scan(self, codigo: str, engine: str = "manual") -> Scanner:
+    t0 = time.perf_counter()
+    sc = Scanner(codigo, engine=engine)
+    sc.scan_all()
+    segundos = time.perf_counter() - t0
+    self.observe_tokens(sc.tokens, len(codigo.encode("utf-8", "surrogatepass")), segundos, len(sc.symbols))
+    return sc
+
+  # analisa um arquivo (lido em blocos), registrando a análise
+  def scan_path(self, caminho: Union[str, "os.PathLike[str]"], engine: str = "manual",
+                encoding: str = "utf-8") -> Scanner:
+    t0 = time.perf_counter()
+    sc = Scanner.from_path(caminho, encoding=encoding, engine=engine)
+    sc.scan_all()
+    segundos = time.perf_counter() - t0
+    self.observe_tokens(sc.tokens, os.path.getsize(caminho), segundos, len(sc.symbols))
+    return sc
+
+  # =========================
+  # EXPORTAÇÃO
+  # =========================
+  def export_prometheus(self) -> str:
+    p = self.prefixo
+    with self._trava:
+      taxa_erros = self.erros / self.tokens if self.tokens else 0.0
+      linhas: List[str] = []
+
+      def metrica(nome: str, tipo: str, ajuda: str, valor: float):
+        linhas.append(f"# HELP {p}_{nome} {ajuda}")
+        linhas.append(f"# TYPE {p}_{nome} {tipo}")
+        linhas.append(f"{p}_{nome} {_numero(valor)}")
+
+      metrica("files_total", "counter", "Entradas analisadas.", self.arquivos)
+      metrica("bytes_total", "counter", "Bytes de código-fonte analisados.", self.bytes)
+      metrica("tokens_total", "counter", "Tokens produzidos.", self.tokens)
+      metrica("error_tokens_total", "counter", "Tokens do tipo ERRO produzidos.", self.erros)
+      metrica("error_token_ratio", "gauge", "Fração de tokens do tipo ERRO.", taxa_erros)
+      metrica("symbol_table_size", "gauge", "Símbolos na tabela da última análise.", self.simbolos)
+      metrica("symbol_table_size_max", "gauge", "Maior tabela de símbolos observada.", self.simbolos_max)
+
+      nome = f"{p}_scan_duration_seconds"
+      linhas.append(f"# HELP {nome} Duração de cada análise.")
+      linhas.append(f"# TYPE {nome} histogram")
+      acumulado = 0
+      for limite, n in zip(self.baldes + (float("inf"),), self._contagens):
+        acumulado += n
+        linhas.append(f'{nome}_bucket{{le="{_numero(limite)}"}} {acumulado}')
+      linhas.append(f"{nome}_sum {_numero(self.segundos)}")
+      linhas.append(f"{nome}_count {self.arquivos}")
+    return "\n".join(linhas) + "\n"
+
+  # grava no arquivo de forma atômica (o coletor nunca lê um arquivo pela metade)
+  def write_prometheus(self, caminho: Union[str, "os.PathLike[str]"]):
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    fd, tmp = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+      f.write(self.export_prometheus())
+    os.replace(tmp, caminho)
+
+  # serve GET /metrics numa thread em segundo plano; porta 0 escolhe uma livre
+  # (em servidor.server_address); encerre com servidor.shutdown()
+  def serve(self, porta: int = 9464, endereco: str = "127.0.0.1") -> ThreadingHTTPServer:
+    metricas = self
+
+    class Handler(BaseHTTPRequestHandler):
+      def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+          self.send_error(404)
+          return
+        corpo = metricas.export_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+      def log_message(self, *args):
+        pass
+
+    servidor = ThreadingHTTPServer((endereco, porta), Handler)
+    threading.Thread(target=servidor.serve_forever, name="lexer-metricas", daemon=True).start()
+    return servidor
@@ -0,0 +1,287 @@
+# Serviço de análise léxica - Compiladores
+# servidor asyncio de longa duração (TCP ou socket Unix) para que clientes não paguem
+# a inicialização do interpretador a cada requisição
+#
+# protocolo: JSON por linha (NDJSON), em ambos os sentidos
+#   requisição: {"id": 1, "codigo": "int a;", "engine": "manual"}   (id e engine opcionais)
+#   resposta:   {"id": 1, "tokens": [["KEYWORD", "int", 0], ...], "symbols": {"a": {"id": 1, "count": 1}}}
+#               {"id": 1, "erro": "mensagem"}
+# as respostas saem na ordem das requisições de cada conexão (o cliente pode enviar
+# várias sem esperar). requisições pequenas são agrupadas em lotes e cada lote vai
+# para o pool de processos numa única tarefa; as grandes vão sozinhas. o laço de
+# eventos nunca executa scan_all. filas limitadas aplicam contrapressão: com o pool
+# ocupado, o servidor para de ler dos sockets até haver vaga
+#
+#   python lexer_servico.py --porta 7878 [--unix /tmp/lexer.sock] [--metricas-porta 9464]
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from lexer_manual import Scanner, TokenType
+from lexer_metricas import LexerMetrics
+
+PORTA_PADRAO = 7878
+LIMITE_LINHA = 64 << 20    # maior requisição aceita (padrão), em bytes
+LIMITE_LEITURA = 64 << 10  # limite do StreamReader: a linha é lida em pedaços deste tamanho
+
+Resultado = Tuple[str, int, int, int, float, int]  # corpo JSON, bytes, tokens, erros, segundos, símbolos
+
+# =========================
+# TAREFAS DOS PROCESSOS
+# =========================
+# analisa e já serializa a resposta (sem o id), para o processo principal só repassar
+def _analisa(codigo: str, engine: str) -> Resultado:
+  t0 = time.perf_counter()
+  try:
+    sc = Scanner(codigo, engine=engine)
+    sc.scan_all()
+  except ValueError as exc:  # engine desconhecido
+    return json.dumps({"erro": str(exc)}), 0, 0, 0, 0.0, 0
+  segundos = time.perf_counter() - t0
+  corpo = json.dumps({"tokens": [[t.tipo.name, t.lexema, t.inicio] for t in sc.tokens], "symbols": sc.symbols.to_dict()})
+  erros = sum(1 for t in sc.tokens if t.tipo is TokenType.ERRO)
+  tamanho = len(codigo.encode("utf-8", "surrogatepass"))
+  return corpo, tamanho, len(sc.tokens), erros, segundos, len(sc.symbols)
+
+def _analisa_lote(lote: List[Tuple[str, str]]) -> List[Resultado]:
+  return [_analisa(codigo, engine) for codigo, engine in lote]
+
+def _resposta(id_, corpo: str) -> bytes:
+  return ('{"id": ' + json.dumps(id_) + ", " + corpo[1:] + "\n").encode("utf-8")
+
+def _erro(id_, mensagem: str) -> bytes:
+  return _resposta(id_, json.dumps({"erro": mensagem}))
+
+# lê uma linha do StreamReader em pedaços: o buffer do reader fica em torno de
+# LIMITE_LEITURA e só a própria linha, de no máximo `maximo` bytes, é guardada;
+# b"" no fim da conexão, ValueError se a linha passar de `maximo`
+async def _le_linha(reader: asyncio.StreamReader, maximo: int) -> bytes:
+  partes: List[bytes] = []
+  total = 0
+  while True:
+    fim = True
+    try:
+      parte = await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as exc:  # conexão fechada: o resto sem "\n"
+      parte = exc.partial
+    except asyncio.LimitOverrunError as exc:  # ainda sem "\n": consome o que já chegou
+      parte = await reader.readexactly(exc.consumed)
+      fim = False
+    total += len(parte)
+    if total > maximo:
+      raise ValueError(f"linha maior que {maximo} bytes")
+    partes.append(parte)
+    if fim:
+      return b"".join(partes)
+
+# =========================
+# SERVIDOR
+# =========================
+class LexerServer:
+  def __init__(self, workers: Optional[int] = None, lote_max: int = 64, espera_lote: float = 0.002,
+               limite_grande: int = 32 << 10, max_fila: int = 1024, max_pendentes: int = 256,
+               max_requisicao: int = LIMITE_LINHA, metricas: Optional[LexerMetrics] = None):
+    self.workers = workers or os.cpu_count() or 1
+    self.lote_max = lote_max              # requisições pequenas por tarefa do pool
+    self.espera_lote = espera_lote        # quanto esperar (s) para completar um lote
+    self.limite_grande = limite_grande    # acima disso (caracteres) a requisição vai sozinha
+    self.max_fila = max_fila              # requisições pequenas aguardando lote
+    self.max_pendentes = max_pendentes    # respostas em aberto por conexão
+    self.max_requisicao = max_requisicao  # maior requisição aceita (bytes); acima disso a conexão fecha
+    self.metricas = metricas
+    self._pool: Optional[ProcessPoolExecutor] = None
+    self._fila: Optional[asyncio.Queue] = None
+    self._vagas: Optional[asyncio.Semaphore] = None  # tarefas em andamento no pool
+    self._despachante: Optional[asyncio.Task] = None
+    self._servidor: Optional[asyncio.AbstractServer] = None
+    self._conexoes: Set[asyncio.Task] = set()
+
+  # começa a aceitar conexões (TCP em host:porta, ou socket Unix em caminho);
+  # porta 0 escolhe uma livre (ver .enderecos)
+  async def start(self, host: str = "127.0.0.1", porta: int = PORTA_PADRAO, caminho: Optional[str] = None):
+    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+    self._fila = asyncio.Queue(self.max_fila)
+    self._vagas = asyncio.Semaphore(2 * self.workers)
+    self._despachante = asyncio.create_task(self._lotes())
+    if caminho is not None:
+      self._servidor = await asyncio.start_unix_server(self._conexao, caminho, limit=LIMITE_LEITURA)
+    else:
+      self._servidor = await asyncio.start_server(self._conexao, host, porta, limit=LIMITE_LEITURA)
+
+  @property
+  def enderecos(self) -> list:
+    return [s.getsockname() for s in self._servidor.sockets]
+
+  async def serve_forever(self):
+    await self._servidor.serve_forever()
+
+  async def close(self):
+    self._servidor.close()
+    await self._servidor.wait_closed()
+    for tarefa in self._conexoes:
+      tarefa.cancel()
+    await asyncio.gather(*self._conexoes, return_exceptions=True)
+    self._despachante.cancel()
+    # shutdown espera os processos terminarem: fora do laço de eventos
+    await asyncio.to_thread(self._pool.shutdown, cancel_futures=True)
+
+  # uma conexão: lê requisições e enfileira a resposta de cada uma (em ordem) para
+  # a tarefa que escreve; com max_pendentes respostas em aberto, para de ler
+  async def _conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    tarefa = asyncio.current_task()
+    self._conexoes.add(tarefa)
+    pendentes: asyncio.Queue = asyncio.Queue(self.max_pendentes)
+    escritor = asyncio.create_task(self._responde(pendentes, writer))
+    try:
+      while True:
+        try:
+          linha = await _le_linha(reader, self.max_requisicao)
+        except ValueError:  # linha maior que max_requisicao
+          await pendentes.put(_pronto(_erro(None, f"requisição maior que {self.max_requisicao} bytes")))
+          break
+        except ConnectionError:
+          break
+        if not linha:
+          break
+        if linha.strip():
+          await pendentes.put(await self._despacha(linha))
+      await pendentes.put(None)
+      await escritor
+    except asyncio.CancelledError:  # servidor encerrando: descarta o que falta
+      escritor.cancel()
+    finally:
+      self._conexoes.discard(tarefa)
+      writer.close()
+      try:
+        await writer.wait_closed()
+      except ConnectionError:
+        pass
+
+  async def _responde(self, pendentes: asyncio.Queue, writer: asyncio.StreamWriter):
+    conectado = True
+    while True:
+      futuro = await pendentes.get()
+      if futuro is None:
+        return
+      resposta = await futuro
+      if not conectado:
+        continue  # o cliente saiu: só consome as respostas que faltam
+      try:
+        writer.write(resposta)
+        await writer.drain()
+      except ConnectionError:
+        conectado = False
+
+  # valida a requisição e devolve o futuro da linha de resposta
+  async def _despacha(self, linha: bytes) -> "asyncio.Future[bytes]":
+    id_ = None
+    try:
+      req = json.loads(linha)
+      id_ = req.get("id")
+      codigo = req["codigo"]
+      engine = req.get("engine", "manual")
+      if not isinstance(codigo, str) or not isinstance(engine, str):
+        raise TypeError
+    except (ValueError, KeyError, TypeError, AttributeError):
+      return _pronto(_erro(id_, 'requisição inválida: esperado {"codigo": "...", "engine": "..."}'))
+    loop = asyncio.get_running_loop()
+    futuro = loop.create_future()
+    if len(codigo) > self.limite_grande:
+      await self._vagas.acquire()
+      tarefa = loop.run_in_executor(self._pool, _analisa, codigo, engine)
+      tarefa.add_done_callback(lambda t: self._entrega(t, [(id_, futuro)]))
+    else:
+      await self._fila.put((codigo, engine, id_, futuro))  # cheia: contrapressão
+    return futuro
+
+  # junta requisições pequenas em lotes e manda cada lote ao pool
+  async def _lotes(self):
+    loop = asyncio.get_running_loop()
+    while True:
+      lote = [await self._fila.get()]
+      prazo = loop.time() + self.espera_lote
+      while len(lote) < self.lote_max:
+        if not self._fila.empty():
+          lote.append(self._fila.get_nowait())
+          continue
+        restante = prazo - loop.time()
+        if restante <= 0:
+          break
+        try:
+          lote.append(await asyncio.wait_for(self._fila.get(), restante))
+        except asyncio.TimeoutError:
+          break
+      await self._vagas.acquire()  # pool ocupado: a fila enche e as conexões param de ler
+      tarefa = loop.run_in_executor(self._pool, _analisa_lote, [(c, e) for c, e, _, _ in lote])
+      tarefa.add_done_callback(lambda t, lote=lote: self._entrega(t, [(i, f) for _, _, i, f in lote]))
+
+  # repassa os resultados de uma tarefa do pool aos futuros das requisições
+  def _entrega(self, tarefa: "asyncio.Future", destinos: List[Tuple[object, "asyncio.Future[bytes]"]]):
+    self._vagas.release()
+    if tarefa.cancelled():
+      return
+    exc = tarefa.exception()
+    if exc is not None:  # ex.: processo do pool morreu
+      for id_, futuro in destinos:
+        if not futuro.done():
+          futuro.set_result(_erro(id_, f"falha na análise: {exc!r}"))
+      return
+    resultados = tarefa.result()
+    if not isinstance(resultados, list):
+      resultados = [resultados]
+    for (id_, futuro), resultado in zip(destinos, resultados):
+      if futuro.done():
+        continue
+      corpo, tamanho, tokens, erros, segundos, simbolos = resultado
+      if self.metricas is not None and tokens:
+        self.metricas.observe(tamanho, tokens, erros, segundos, simbolos)
+      futuro.set_result(_resposta(id_, corpo))
+
+def _pronto(valor: bytes) -> "asyncio.Future[bytes]":
+  futuro = asyncio.get_running_loop().create_future()
+  futuro.set_result(valor)
+  return futuro
+
+# =========================
+# LINHA DE COMANDO
+# =========================
+async def _servir(args):
+  metricas = LexerMetrics()
+  servidor = LexerServer(args.workers, args.lote, limite_grande=args.limite_grande,
+                         max_requisicao=args.max_requisicao, metricas=metricas)
+  await servidor.start(args.host, args.porta, args.unix)
+  if args.metricas_porta is not None:
+    metricas.serve(args.metricas_porta)
+  print(f"lexer_servico ouvindo em {', '.join(map(str, servidor.enderecos))}", file=sys.stderr)
+  try:
+    await servidor.serve_forever()
+  finally:
+    await servidor.close()
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description="Serviço de análise léxica (NDJSON sobre TCP ou socket Unix).")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+  parser.add_argument("--unix", help="caminho de socket Unix (em vez de TCP)")
+  parser.add_argument("--workers", type=int, default=None, help="processos de análise (padrão: nº de CPUs)")
+  parser.add_argument("--lote", type=int, default=64, help="requisições pequenas por lote")
+  parser.add_argument("--limite-grande", type=int, default=32 << 10,
+                      help="tamanho (caracteres) a partir do qual a requisição não entra em lote")
+  parser.add_argument("--max-requisicao", type=int, default=LIMITE_LINHA,
+                      help=f"maior requisição aceita, em bytes (padrão: {LIMITE_LINHA})")
+  parser.add_argument("--metricas-porta", type=int, default=None, help="serve métricas Prometheus em /metrics")
+  args = parser.parse_args(argv)
+  try:
+    asyncio.run(_servir(args))
+  except KeyboardInterrupt:
+    pass
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,69 @@
+import pytest
+from bench_lexer import executa, formata_tamanho, gera_fonte, le_tamanho
+from lexer_manual import Scanner, TokenType
+
+def test_gera_fonte():
+    fonte = gera_fonte(5000, seed=1)
+    assert len(fonte) == 5000 and fonte == gera_fonte(5000, seed=1)
+    assert not any(t.tipo is TokenType.ERRO for t in Scanner(fonte).scan_all())
+    so_ids = gera_fonte(2000, {'keyword': 0, 'num': 0, 'float': 0, 'operador': 0, 'delimitador': 0,
+                               'string': 0, 'comentario': 0, 'diretiva': 0})
+    assert {t.tipo for t in Scanner(so_ids).scan_all()} == {TokenType.ID, TokenType.EOF}
+    with pytest.raises(ValueError):
+        gera_fonte(10, {'macro': 1})
+
+def test_tamanhos():
+    assert [le_tamanho(t) for t in ('512', '64K', '1mb', '1G')] == [512, 65536, 1 << 20, 1 << 30]
+    assert formata_tamanho(64 << 10) == '64K' and formata_tamanho(1000) == '1000'
+
+def test_executa():
+    relatorio = executa([1024], ['manual', 'exemplo1'], repeticoes=1, aquecimento=0)
+    assert [r['cenario'] for r in relatorio['resultados']] == ['manual', 'exemplo1']
+    for r in relatorio['resultados']:
+        assert r['tokens'] > 0 and r['mb_s'] > 0 and r['pico_bytes'] > 0
+
+def test_executa_contagem(monkeypatch):
+    import bench_lexer
+    monkeypatch.setattr(bench_lexer, 'BLOCO_MAXIMO', 1000)
+    fonte = gera_fonte(4500)
+    assert len(fonte) == 4500 and fonte[:1000] * 4 == fonte[:4000]
+    relatorio = executa([2048], ['manual', 'exemplo1'], repeticoes=1, aquecimento=0, memoria_ate=1024)
+    contagem, lista = relatorio['resultados']
+    assert (contagem['modo'], lista['modo']) == ('contagem', 'lista')
+    assert 'pico_bytes' not in contagem and contagem['tokens'] == len(Scanner(gera_fonte(2048)).scan_all())
+
+def test_gate_compara():
+    from bench_gate import compara
+    def relatorio(mb_s, bytes_por_token):
+        return {'resultados': [{'cenario': 'manual', 'bytes': 1000, 'mb_s': mb_s, 'mediana': 1e-3 / mb_s,
+                                'iqr': 0.0, 'bytes_por_token': bytes_por_token}]}
+    base = relatorio(2.0, 100)
+    linhas, regrediu = compara(relatorio(1.9, 105), base, limite=0.10)
+    assert not regrediu and [l[-1] for l in linhas] == ['ok', 'ok']
+    assert compara(relatorio(1.5, 100), base, limite=0.10)[1]
+    assert compara(relatorio(2.0, 120), base, limite=0.10)[1]
+    novo = {'resultados': [{**relatorio(1.0, 100)['resultados'][0], 'cenario': 'afd'}]}
+    assert compara(novo, base)[0][0][-1] == 'novo'
+
+def test_bench_palavras():
+    from bench_palavras import ScannerDoisPassos, executa
+    fonte = gera_fonte(4096, seed=3)
+    for engine in ('manual', 'regex', 'afd'):
+        antigo, novo = ScannerDoisPassos(fonte, engine=engine), Scanner(fonte, engine=engine)
+        assert antigo.scan_all() == novo.scan_all() and antigo.symbols == novo.symbols
+    relatorio = executa(2048, repeticoes=1, aquecimento=0)
+    assert [r['caso'] for r in relatorio['resultados']] == ['classificacao', 'scan_all/manual']
+    assert relatorio['palavras'] > 0
+
+def test_bench_longos():
+    from bench_longos import CASOS, executa
+    relatorio = executa(4096, ['string', 'diretiva'], ['manual'], repeticoes=1, aquecimento=0)
+    assert [r['caso'] for r in relatorio['resultados']] == ['string', 'diretiva']
+    assert all(len(gera(4096)) == 4096 for gera in CASOS.values())
+
+def test_bench_incremental():
+    from bench_incremental import executa
+    relatorio = executa([2048, 8192], ['manual', 'afd'], teclas=10)
+    assert [(r['engine'], r['bytes']) for r in relatorio['resultados']] == \
+        [('manual', 2048), ('afd', 2048), ('manual', 8192), ('afd', 8192)]
+    assert all(0 < r['mediana'] <= r['p95'] <= r['maximo'] for r in relatorio['resultados'])
@@ -0,0 +1,42 @@
+import io
+import pytest
+from lexer_binario import BLOCO, TokenFile, TokenReader, dump, load
+from lexer_manual import Scanner
+from test_lexer import codigo, codigo2, codigo3, codigo4
+
+fonte = (codigo + codigo2 + codigo3 + codigo4 + '"a\nb" ção \x00 x') * 20
+
+def test_binario_ida_e_volta():
+    sc = Scanner(fonte)
+    tokens = sc.scan_all()
+    saida = io.BytesIO()
+    dump(tokens, sc.symbols, saida)
+    assert len(saida.getvalue()) < len(fonte)
+    saida.seek(0)
+    lidos, symbols = load(saida)
+    assert lidos == tokens and symbols == sc.symbols
+    assert [t.inicio for t in lidos] == [t.inicio for t in tokens]
+    saida.seek(0)
+    leitor = TokenReader(saida, chunk_size=3)  # buffers pequenos: registros cortados
+    assert list(leitor) == tokens and leitor.symbols == sc.symbols
+
+def test_binario_acesso_aleatorio(tmp_path):
+    sc = Scanner(fonte)
+    tokens = sc.scan_all()
+    caminho = tmp_path / 'tokens.lxtk'
+    with open(caminho, 'wb') as f:
+        dump(tokens, sc.symbols, f)
+    with TokenFile(caminho) as arq:
+        assert len(arq) == len(tokens) and arq.symbols == sc.symbols
+        for i in [0, 1, BLOCO - 1, BLOCO, len(tokens) // 2, len(tokens) - 1, -1]:
+            assert arq[i] == tokens[i] and arq[i].inicio == tokens[i].inicio
+        with pytest.raises(IndexError):
+            arq[len(tokens)]
+
+def test_binario_invalido():
+    with pytest.raises(ValueError):
+        TokenReader(io.BytesIO(b'nada de tokens'))
+    vazio = io.BytesIO()
+    dump([], {}, vazio)
+    vazio.seek(0)
+    assert load(vazio) == ([], {})
@@ -0,0 +1,83 @@
+import os
+import pytest
+import lexer_manual
+from lexer_cache import ScanMemo, TokenCache, _serializa, fingerprint
+from lexer_manual import Scanner
+from test_lexer import codigo, codigo2, codigo3, codigo4
+
+def test_cache_acerto_e_falha(tmp_path):
+    cache = TokenCache(tmp_path / 'cache')
+    primeiro = cache.scan(codigo2)
+    assert (cache.acertos, cache.falhas) == (0, 1)
+    segundo = TokenCache(tmp_path / 'cache').scan(codigo2)  # outro processo/build
+    sc = Scanner(codigo2)
+    assert list(primeiro) == list(segundo) == sc.scan_all()
+    assert [t.inicio for t in segundo] == [t.inicio for t in sc.tokens]
+    assert segundo.symbols == sc.symbols
+    cache.scan(codigo3)
+    assert (cache.acertos, cache.falhas) == (0, 2)
+
+def test_cache_scan_path(tmp_path):
+    caminho = tmp_path / 'f.c'
+    caminho.write_text(codigo4)
+    cache = TokenCache(tmp_path / 'cache')
+    cache.scan_path(caminho)
+    assert list(cache.scan_path(caminho)) == Scanner(codigo4).scan_all()
+    assert cache.acertos == 1
+
+def test_cache_codificacao_muda_chave(tmp_path):
+    caminho = tmp_path / 'f.c'
+    caminho.write_bytes(b'\xc3\xa9 = 1;')
+    cache = TokenCache(tmp_path / 'cache')
+    latin1 = cache.scan_path(caminho, encoding='latin-1')
+    assert list(latin1) == Scanner('\xc3\xa9 = 1;').scan_all()
+    assert list(cache.scan('\xe9 = 1;')) == Scanner('\xe9 = 1;').scan_all()
+    assert (cache.acertos, cache.falhas) == (0, 2)
+    cache.scan_path(caminho)  # utf-8: mesmo texto de scan('é = 1;')
+    cache.scan_path(caminho, encoding='iso-8859-1')  # outro nome da mesma codificação
+    assert (cache.acertos, cache.falhas) == (2, 2)
+
+def test_cache_configuracao_muda_chave(tmp_path, monkeypatch):
+    antes = fingerprint()
+    monkeypatch.setattr(lexer_manual, 'KEYWORDS', lexer_manual.KEYWORDS | {'inline'})
+    assert fingerprint() != antes
+
+def test_cache_despeja_menos_usados(tmp_path):
+    cache = TokenCache(tmp_path / 'cache')
+    cache.scan(codigo)
+    cache.scan(codigo2)
+    # codigo2 mais antigo; codigo usado recentemente
+    os.utime(cache._caminho(cache.chave(codigo2.encode())), ns=(0, 0))
+    cache.scan(codigo)
+    tamanhos = [e.stat().st_size for e in os.scandir(tmp_path / 'cache')]
+    cache.max_bytes = sum(tamanhos) + len(_serializa(Scanner(codigo3).scan_columns())) - 1
+    cache.scan(codigo3)  # passa do limite: remove codigo2
+    cache.scan(codigo)
+    cache.scan(codigo2)
+    assert (cache.acertos, cache.falhas) == (2, 4)
+
+def test_memo_acertos_e_imutabilidade():
+    memo = ScanMemo()
+    tokens, symbols = memo.scan(codigo2)
+    sc = Scanner(codigo2)
+    assert list(tokens) == sc.scan_all() and symbols == sc.symbols
+    tokens[0].lexema = 'corrompido'
+    with pytest.raises(TypeError):
+        symbols['main']['count'] = 0
+    de_novo, _ = memo.scan(codigo2)
+    assert list(de_novo) == sc.tokens
+    assert (memo.acertos, memo.falhas) == (1, 1)
+
+def test_memo_lru():
+    memo = ScanMemo(max_entries=2)
+    memo.scan(codigo)
+    memo.scan(codigo2)
+    memo.scan(codigo)   # codigo2 passa a ser o menos usado
+    memo.scan(codigo3)  # remove codigo2
+    assert len(memo) == 2
+    memo.scan(codigo)
+    memo.scan(codigo2)
+    assert (memo.acertos, memo.falhas) == (2, 4)
+    pequeno = ScanMemo(max_bytes=len(codigo))
+    pequeno.scan(codigo)
+    assert len(pequeno) == 0
@@ -1,5 +1,6 @@
+import random
 import pytest
-from lexer_manual import Scanner, TokenType
+from lexer_manual import IncrementalScanner, Scanner, TokenType
 from collections import Counter
 
 codigo = '''
@@ -124,4 +125,355 @@ def test_codigo4():
     assert tipo_counts[TokenType.MOD] == 1      # %
     assert tipo_counts[TokenType.EQ] == 1       # ==
     assert tipo_counts[TokenType.STRING] == 2   # "even\n", "odd\n"
-    assert tipo_counts[TokenType.EOF] == 1
\ No newline at end of file
+    assert tipo_counts[TokenType.EOF] == 1
+def test_iter_tokens():
+    sc = Scanner(codigo)
+    it = sc.iter_tokens()
+    primeiro = next(it)
+    assert primeiro.tipo == TokenType.KEYWORD and primeiro.lexema == 'int'
+    segundo = next(it)
+    assert segundo.lexema == 'id1'
+    assert sc.symbols == {'a': {'id': 1, 'count': 1}}
+    assert sc.tokens == []
+    resto = list(it)
+    assert resto[-1].tipo == TokenType.EOF
+    assert [primeiro, segundo] + resto == Scanner(codigo).scan_all()
+    assert sc.symbols['a']['count'] == 3
+
+def test_from_file_em_blocos(tmp_path):
+    fonte = codigo2 + '/* comentário\n longo */ char *s = "olá, mundo";\n' + codigo3
+    esperado = Scanner(fonte)
+    esperado.scan_all()
+    caminho = tmp_path / 'fonte.c'
+    caminho.write_text(fonte, encoding='utf-8')
+    for tamanho in (1, 3, 7, 64):
+        sc = Scanner.from_file(caminho, chunk_size=tamanho)
+        assert sc.scan_all() == esperado.tokens
+        assert sc.symbols == esperado.symbols
+    with open(caminho, encoding='utf-8') as f:
+        assert Scanner.from_file(f, chunk_size=5).scan_all() == esperado.tokens
+
+def test_from_path_mmap(tmp_path):
+    fonte = codigo4 + '// ação\n"é"\n'
+    esperado = Scanner(fonte).scan_all()
+    caminho = tmp_path / 'fonte.c'
+    caminho.write_bytes(fonte.encode('utf-8'))
+    for tamanho in (2, 16, 1 << 20):
+        assert Scanner.from_path(caminho, mmap=True, chunk_size=tamanho).scan_all() == esperado
+    vazio = tmp_path / 'vazio.c'
+    vazio.write_bytes(b'')
+    assert [t.tipo for t in Scanner.from_path(vazio, mmap=True).scan_all()] == [TokenType.EOF]
+
+casos_dificeis = [
+    codigo, codigo2, codigo3, codigo4,
+    '"abc\\"def" "x\\\\" y" "sem fim',
+    "'a' '\\'' '\\\\' 'aberto\nlinha\n",
+    'x = 3,14 + 1.5e3 + .5 + 1. + 8a_b;',
+    'a->b ... .. && || & | != !x <= >= += -= *= /= %',
+    '/* não fechado ',
+    '// só comentário',
+    '#define X 1\r\n#include "y.h"',
+    'ação = π² + ½ + 一;\x00 int \xa0 z',
+]
+
+@pytest.mark.parametrize('engine', ['regex', 'afd'])
+@pytest.mark.parametrize('fonte', casos_dificeis)
+def test_engines_equivalentes(engine, fonte):
+    esperado = Scanner(fonte)
+    esperado.scan_all()
+    sc = Scanner(fonte, engine=engine)
+    assert sc.scan_all() == esperado.tokens
+    assert sc.symbols == esperado.symbols
+
+def test_palavras_tabela_trocada():
+    sc = Scanner('int a; a = b;')
+    sc.symbols = {'a': {'id': 7, 'count': 2}}
+    lexemas = [t.lexema for t in sc.scan_all()]
+    assert lexemas[:2] == ['int', 'id7'] and 'id8' in lexemas
+    assert sc.symbols == {'a': {'id': 7, 'count': 4}, 'b': {'id': 8, 'count': 1}}
+    assert Scanner('int').scan_all()[0].tipo == TokenType.KEYWORD
+    # a consulta do scanner é o índice da própria tabela; as palavras-chave não aparecem nela
+    assert sc._palavras is sc.symbols._posicao
+    assert len(sc.symbols) == 2 and 'int' not in sc.symbols and list(sc.symbols) == ['a', 'b']
+    with pytest.raises(KeyError):
+        sc.symbols['int']
+    # uma palavra-chave nunca vira símbolo: nem por add nem numa tabela atribuída
+    with pytest.raises(ValueError):
+        sc.symbols.add('int')
+    assert 'int' not in sc.symbols and sc.symbols.next_id == 9
+    with pytest.raises(ValueError):
+        sc.symbols = {'int': {'id': 1, 'count': 1}}
+    sc.i, sc.codigo = 0, 'int b'
+    assert [t.tipo for t in sc.scan_all()[-3:-1]] == [TokenType.KEYWORD, TokenType.ID]
+    assert sc.symbols.count_of('b') == 2
+
+def test_tokens_longos(tmp_path):
+    from bench_longos import CASOS
+    for nome, gera in CASOS.items():
+        fonte = gera(20000) + '\n"aberto \\\n até o fim\0 x'
+        esperado = Scanner(fonte)
+        esperado.scan_all()
+        assert max(len(t.lexema) for t in esperado.tokens) > 10000 or nome.startswith('comentario')
+        for engine in ('regex', 'afd'):
+            assert Scanner(fonte, engine=engine).scan_all() == esperado.tokens
+        caminho = tmp_path / f'{nome}.c'
+        caminho.write_text(fonte, encoding='utf-8')
+        for tamanho in (7, 4096):
+            sc = Scanner.from_file(caminho, chunk_size=tamanho)
+            assert sc.scan_all() == esperado.tokens and sc.symbols == esperado.symbols
+            # o afd retoma o autômato no meio do token a cada recarga
+            assert Scanner.from_file(caminho, chunk_size=tamanho, engine='afd').scan_all() == esperado.tokens
+
+def test_blocos_token_maior_que_bloco(tmp_path, monkeypatch):
+    # tokens ~50 vezes maiores que o bloco: o buffer dobra a cada recarga, então o
+    # número de recargas (e de recópias do token) cresce com o log do tamanho do token
+    fonte = ('"' + 'texto \\" ' * 400 + '";\n#define X ' + '1, ' * 1000 + '\n'
+             + 'nome' * 800 + ' = ' + '9' * 3200 + ';\n')
+    esperado = Scanner(fonte).scan_all()
+    recargas = []
+    fill = Scanner._fill
+    monkeypatch.setattr(Scanner, '_fill', lambda sc: recargas.append(1) or fill(sc))
+    caminho = tmp_path / 'longo.c'
+    caminho.write_text(fonte, encoding='utf-8')
+    assert Scanner.from_file(caminho, chunk_size=64).scan_all() == esperado
+    assert len(fonte) > 200 * 64 and len(recargas) < 40
+
+@pytest.mark.parametrize('tamanho', [1, 2, 3, 5])
+def test_afd_blocos_retoma(tamanho, tmp_path):
+    # fronteiras de bloco em todo ponto de tokens, lookahead e estado morto
+    fonte = 'a1 3.14 3,14 8a ... -> x/=y /* c **/ // l\n"s\\\\"\'c\' #d\n && | é9 8é 1.\n' * 3
+    caminho = tmp_path / 'f.c'
+    caminho.write_text(fonte, encoding='utf-8')
+    assert Scanner.from_file(caminho, chunk_size=tamanho, engine='afd').scan_all() == Scanner(fonte).scan_all()
+
+def test_regex_blocos_comentario_longo(tmp_path, monkeypatch):
+    # espaços e comentários longos são descartados à medida que são lidos: o buffer
+    # não acumula o comentário inteiro esperando o próximo token
+    fonte = 'a /*' + ' * texto do comentário\n' * 400 + '*/ ' + '// linha\n' * 400 + ' \n' * 2000 + 'b;'
+    esperado = Scanner(fonte).scan_all()
+    buffer = []
+    fill = Scanner._fill
+    monkeypatch.setattr(Scanner, '_fill', lambda sc: fill(sc) and not buffer.append(len(sc.codigo)))
+    caminho = tmp_path / 'comentarios.c'
+    caminho.write_text(fonte, encoding='utf-8')
+    assert Scanner.from_file(caminho, chunk_size=64, engine='regex').scan_all() == esperado
+    assert len(fonte) > 200 * 64 and max(buffer) <= 4 * 64
+
+def test_pula_espacos_e_comentarios(tmp_path):
+    fonte = 'a \t\xa0\u2028 /* x **/ b // c\n\n d /* nulo\0 e // f\0 g /**/h /* aberto\n  '
+    lexemas = [t.lexema for t in Scanner(fonte).scan_all()]
+    assert lexemas == ['id1', 'id2', 'id3', '\0', 'id4', '\0', 'id5', 'id6', '']
+    caminho = tmp_path / 'comentarios.c'
+    caminho.write_text(fonte, encoding='utf-8')
+    esperado = Scanner(fonte).scan_all()
+    for tamanho in range(1, 10):
+        assert Scanner.from_file(caminho, chunk_size=tamanho).scan_all() == esperado
+
+def test_symbol_table():
+    import pickle
+    from lexer_manual import SymbolTable
+    sc = Scanner('int b; b = a + b; c = a;')
+    sc.scan_all()
+    t = sc.symbols
+    assert isinstance(t, SymbolTable) and len(t) == 3 and 'a' in t and 'x' not in t
+    assert t == {'b': {'id': 1, 'count': 3}, 'a': {'id': 2, 'count': 2}, 'c': {'id': 3, 'count': 1}}
+    assert t['a']['count'] == 2 and dict(t['a']) == {'id': 2, 'count': 2}
+    with pytest.raises(TypeError):
+        t['a']['count'] = 0
+    assert t.id_of('c') == 3 and t.name_of(2) == 'a' and t.count_of('b') == 3
+    assert t.top(2) == [('b', 1, 3), ('a', 2, 2)]
+    assert [e[0] for e in t.entries(sort_by_name=True)] == ['a', 'b', 'c']
+    assert t.add('a') == 2 and t.add('d', 5) == 4
+    assert t.top(1) == [('d', 4, 5)] and [e[0] for e in t.entries(True)] == ['a', 'b', 'c', 'd']
+    assert t.decrement(3) == 0 and 'c' not in t and t.next_id == 5
+    with pytest.raises(KeyError):
+        t.name_of(3)
+    assert pickle.loads(pickle.dumps(t)) == t and t.to_dict() == dict(t.items())
+    # ids fora de ordem (ex.: tabela restaurada) e junção
+    u = SymbolTable({'x': {'id': 7, 'count': 1}, 'a': {'id': 2, 'count': 1}})
+    assert u.name_of(7) == 'x' and u.next_id == 8
+    with pytest.raises(ValueError):
+        u.add('y', sym_id=2)
+    assert u.merge(t) == [0, 8, 2, 0, 9] and u['a']['count'] == 4 and u['b']['id'] == 8
+    # contagens mudadas pelo scanner descartam o ranking guardado
+    assert u.top(1) == [('d', 9, 5)]
+    outro = Scanner('x x x x x', engine='afd')
+    outro.symbols = u
+    outro.scan_all()
+    assert u.top(1) == [('x', 7, 6)]
+
+def test_engine_desconhecido():
+    with pytest.raises(ValueError):
+        Scanner(codigo, engine='lex')
+
+@pytest.mark.parametrize('engine', ['manual', 'regex', 'afd'])
+def test_lexemas_compartilhados(engine):
+    tokens = Scanner('int a; int a; a += a;', engine=engine).scan_all()
+    assert not hasattr(tokens[0], '__dict__')
+    assert tokens[0].lexema is tokens[3].lexema             # int
+    assert tokens[1].lexema is tokens[4].lexema is tokens[6].lexema  # id1
+    assert tokens[7].lexema == '+=' and tokens[7].lexema is Scanner('+=').scan_all()[0].lexema
+
+@pytest.mark.parametrize('engine', ['manual', 'regex', 'afd'])
+@pytest.mark.parametrize('fonte', casos_dificeis)
+def test_scan_columns(engine, fonte):
+    esperado = Scanner(fonte).scan_all()
+    cols = Scanner(fonte, engine=engine).scan_columns()
+    assert len(cols) == len(esperado)
+    assert list(cols) == esperado
+    assert [t.inicio for t in cols] == [t.inicio for t in esperado]
+    # palavras-chave, operadores e idN reconstruídos usam os lexemas compartilhados do scanner
+    for t, e in zip(cols, esperado):
+        assert t.lexema is e.lexema or t.tipo not in (TokenType.KEYWORD, TokenType.ID, TokenType.ELLIPSIS)
+    assert list(cols) == [cols.token(k) for k in range(len(cols))]
+    assert cols.contagem_por_tipo() == Counter(t.tipo for t in esperado)
+    assert cols.inicios[-1] == len(fonte)
+
+def test_incremental_edicao_local():
+    fonte = codigo4 * 50
+    inc = IncrementalScanner(fonte)
+    assert inc.tokens == Scanner(fonte).scan_all()
+    pos = fonte.index('i % 2')
+    primeiro, removidos, inseridos = inc.edit(pos, pos + 1, 'contador')
+    assert removidos == inseridos <= 3
+    # edições depois e antes da anterior (sem ler tokens entre elas) também ficam locais
+    for outra in (pos + 7 + len(codigo4) * 30, pos + 7 + len(codigo4) * 10):
+        assert inc.edit(outra, outra + 1, 'contador')[1:] == (removidos, inseridos)
+        assert inc.edit(outra, outra + len('contador'), 'i')[1:] == (removidos, inseridos)
+    assert [(t.tipo, t.inicio) for t in inc.tokens] == [(t.tipo, t.inicio) for t in Scanner(inc.codigo).scan_all()]
+    assert f"id{inc.symbols['contador']['id']}" in [t.lexema for t in inc.tokens[primeiro:primeiro + inseridos]]
+    assert inc.symbols['contador']['count'] == 1
+    assert inc.symbols['i']['count'] == 4 * 50 - 1
+    # abrir um comentário de bloco engole o resto do arquivo; fechá-lo restaura
+    inc.edit(pos, pos, '/*')
+    assert inc.tokens == Scanner(inc.codigo).scan_all()
+    assert 'contador' not in inc.symbols
+    inc.edit(pos, pos + 2, '')
+    sc = Scanner(inc.codigo)
+    assert [t.tipo for t in inc.tokens] == [t.tipo for t in sc.scan_all()]
+    assert {n: d['count'] for n, d in inc.symbols.items()} == {n: d['count'] for n, d in sc.symbols.items()}
+
+@pytest.mark.parametrize('engine', ['manual', 'regex', 'afd'])
+def test_incremental_edicoes_aleatorias(engine, monkeypatch):
+    monkeypatch.setattr(IncrementalScanner, 'PEDACO', 16)  # edições cruzam muitos pedaços
+    rnd = random.Random(7)
+    trechos = ['a', 'b2', ' ', '\n', '/*', '*/', '//', '"', "'", '1.5', '8a', 'int', '+=', ';', '#x\n', 'contador']
+    inc = IncrementalScanner(codigo4 * 3, engine=engine)
+    texto = codigo4 * 3
+    for _ in range(300):
+        inicio = rnd.randrange(len(texto) + 1)
+        fim = min(len(texto), inicio + rnd.choice([0, 0, 1, 3, 40]))
+        novo = ''.join(rnd.choices(trechos, k=rnd.choice([0, 1, 2])))
+        primeiro, _, inseridos = inc.edit(inicio, fim, novo)
+        texto = texto[:inicio] + novo + texto[fim:]
+        sc = Scanner(texto, engine=engine)
+        esperado = sc.scan_all()
+        # janela corrige as posições sem mexer na lista (antes e depois da lacuna)
+        a, b = sorted(rnd.randrange(len(esperado) + 1) for _ in range(2))
+        assert len(inc) == len(esperado)
+        assert [(t.tipo, t.inicio) for t in inc.janela(a, b)] == [(t.tipo, t.inicio) for t in esperado[a:b]]
+        assert [t.tipo for t in inc.janela(primeiro, primeiro + inseridos)] == \
+            [t.tipo for t in esperado[primeiro:primeiro + inseridos]]
+        assert inc.codigo == texto
+        assert [t.tipo for t in inc.tokens] == [t.tipo for t in esperado]
+        assert [t.inicio for t in inc.tokens] == [t.inicio for t in esperado]
+        assert {n: d['count'] for n, d in inc.symbols.items()} == {n: d['count'] for n, d in sc.symbols.items()}
+
+def test_incremental_intervalo_invalido():
+    with pytest.raises(ValueError):
+        IncrementalScanner('int a;').edit(3, 20, 'x')
+
+@pytest.mark.parametrize('engine', ['manual', 'regex', 'afd'])
+def test_posicoes(engine, tmp_path):
+    sc = Scanner(codigo, engine=engine)
+    tokens = sc.scan_all()
+    for t in tokens[:-1]:
+        assert codigo.startswith(t.lexema if t.tipo != TokenType.ID else '', t.inicio)
+    assert tokens[-1].inicio == len(codigo)
+    assert sc.posicao(tokens[0]) == (2, 1)
+    assert [(t.lexema, l, c) for t, l, c in sc.errors()] == [('8a', 7, 5)]
+    caminho = tmp_path / 'f.c'
+    caminho.write_text(codigo)
+    sc2 = Scanner.from_path(caminho, chunk_size=4, engine=engine, posicoes=True)
+    tokens2 = sc2.scan_all()
+    assert [t.inicio for t in tokens2] == [t.inicio for t in tokens]
+    assert sc2.errors() == sc.errors()
+    # sem posicoes=True a entrada em blocos não guarda o índice de linhas
+    sc3 = Scanner.from_path(caminho, chunk_size=4, mmap=True, engine=engine)
+    assert [t.inicio for t in sc3.scan_all()] == [t.inicio for t in tokens]
+    assert sc3._linhas is None
+    with pytest.raises(ValueError):
+        sc3.errors()
+    sc4 = Scanner.from_path(caminho, engine=engine)  # o texto inteiro num bloco
+    sc4.scan_all()
+    assert sc4.errors() == sc.errors()
+
+def test_write_tokens_formatos(capsys):
+    import io, json
+    from lexer_manual import write_tokens
+    sc = Scanner('x = "a\tb";\nx')
+    sc.scan_all()
+    sc.print_tokens()
+    sc.print_symbol_table()
+    esperado = "\n=== LISTA DE TOKENS ===\n" + "".join(f"{t.tipo.name:<7}  {t.lexema}\n" for t in sc.tokens)
+    esperado += "\n=== TABELA DE SÍMBOLOS ===\nid1    x                ocorrências: 2\n"
+    assert capsys.readouterr().out == esperado
+
+    tsv = io.StringIO()
+    write_tokens(tsv, sc.tokens, 'tsv', bloco=2)
+    linhas = tsv.getvalue().splitlines()
+    assert len(linhas) == len(sc.tokens) and linhas[2] == 'STRING\t"a\\tb"\t4'
+
+    binario = io.BytesIO()
+    sc.write_tokens(binario, 'jsonl')
+    objs = [json.loads(l) for l in binario.getvalue().decode('utf-8').splitlines()]
+    assert [(o['tipo'], o['lexema'], o['inicio']) for o in objs] == [(t.tipo.name, t.lexema, t.inicio) for t in sc.tokens]
+
+    simbolos = io.StringIO()
+    sc.write_symbol_table(simbolos, formato='jsonl')
+    assert json.loads(simbolos.getvalue()) == {'id': 1, 'nome': 'x', 'count': 2}
+    with pytest.raises(ValueError):
+        sc.write_tokens(io.StringIO(), 'xml')
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_cli(tmp_path, capsys, jobs):
+    import json
+    from lexer_manual import main
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.c').write_text(codigo)
+    (tmp_path / 'sub' / 'b.h').write_text(codigo2)
+    (tmp_path / 'notas.txt').write_text('ignorado')
+    assert main(['-f', 'jsonl', '-j', jobs, str(tmp_path)]) == 0
+    linhas = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    esperado = [(str(tmp_path / 'a.c'), t) for t in Scanner(codigo).scan_all()]
+    esperado += [(str(tmp_path / 'sub' / 'b.h'), t) for t in Scanner(codigo2).scan_all()]
+    assert [(l['arquivo'], l['tipo'], l['lexema']) for l in linhas] == [(a, t.tipo.name, t.lexema) for a, t in esperado]
+    assert main(['-j', jobs, str(tmp_path / 'nao_existe.c'), str(tmp_path / '*.c')]) == 1
+    saida = capsys.readouterr()
+    assert 'nao_existe.c' in saida.err and 'Arquivo: ' + str(tmp_path / 'a.c') in saida.out
+
+def test_cli_argumentos_invalidos(tmp_path, capsys):
+    import glob, os, tempfile
+    from lexer_manual import main
+    for argumentos, mensagem in ((['--encoding', 'nope'], 'codificação desconhecida'),
+                                 (['-j', '-1'], 'inteiro >= 0'), (['-j', 'dois'], 'inteiro >= 0')):
+        with pytest.raises(SystemExit) as exc:
+            main(argumentos + ['a.c'])
+        assert exc.value.code == 2 and mensagem in capsys.readouterr().err
+    # -j: os arquivos temporários com a saída de cada tarefa são apagados
+    (tmp_path / 'a.c').write_text(codigo)
+    antes = set(glob.glob(os.path.join(tempfile.gettempdir(), 'lexer_manual_*')))
+    assert main(['-j', '2', str(tmp_path / 'a.c'), str(tmp_path / 'nao_existe.c')]) == 1
+    assert set(glob.glob(os.path.join(tempfile.gettempdir(), 'lexer_manual_*'))) == antes
+
+def test_scan_profiled():
+    fonte = codigo2 + codigo3 + '// fim\n/* bloco */ 8a @'
+    sc = Scanner(fonte)
+    stats = sc.scan_profiled()
+    assert sc.tokens == Scanner(fonte).scan_all()
+    assert sum(r.bytes for r in stats.regras.values()) == len(fonte)
+    assert stats.regras['comentario_linha'].count == 1 and stats.regras['comentario_bloco'].count == 1
+    assert stats.regras['diretiva'].count == 1 and stats.regras['erro'].count == 1
+    assert stats.tipos[TokenType.ERRO].count == 2
+    assert stats.tipos[TokenType.ID].count == sum(d['count'] for d in sc.symbols.values())
+    assert 'identificador' in stats.report()
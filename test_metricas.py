@@ -0,0 +1,35 @@
+import urllib.request
+from lexer_metricas import LexerMetrics
+from test_lexer import codigo, codigo2
+
+def test_metricas_prometheus(tmp_path):
+    m = LexerMetrics(baldes=(0.5, 10.0))
+    m.scan(codigo)  # "8a" → 1 ERRO
+    caminho = tmp_path / 'a.c'
+    caminho.write_text(codigo2)
+    m.scan_path(caminho)
+    m.observe(100, 10, 5, 20.0, 3)  # análise lenta: só no balde +Inf
+    texto = m.export_prometheus()
+    assert 'lexer_files_total 3' in texto
+    assert 'lexer_error_tokens_total 6' in texto
+    assert 'lexer_symbol_table_size 3' in texto
+    assert '_per_second' not in texto  # vazão vem de rate() sobre os contadores
+    assert 'lexer_scan_duration_seconds_bucket{le="10.0"} 2' in texto
+    assert 'lexer_scan_duration_seconds_bucket{le="+Inf"} 3' in texto
+    assert 'lexer_scan_duration_seconds_count 3' in texto
+    saida = tmp_path / 'lexer.prom'
+    m.write_prometheus(saida)
+    assert saida.read_text() == texto
+
+def test_metricas_http():
+    m = LexerMetrics()
+    m.scan(codigo2)
+    servidor = m.serve(porta=0)
+    try:
+        host, porta = servidor.server_address
+        with urllib.request.urlopen(f'http://{host}:{porta}/metrics') as resposta:
+            assert resposta.headers['Content-Type'].startswith('text/plain')
+            assert 'lexer_files_total 1' in resposta.read().decode('utf-8')
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
@@ -0,0 +1,47 @@
+import pytest
+from lexer_manual import Scanner, split_points
+from lexer_paralelo import lex_files, merge_symbols, scan_parallel
+from test_lexer import casos_dificeis, codigo, codigo2, codigo3, codigo4
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_lex_files(tmp_path, workers):
+    fontes = [codigo, codigo2, codigo3, codigo4]
+    paths = []
+    for k, fonte in enumerate(fontes):
+        p = tmp_path / f'f{k}.c'
+        p.write_text(fonte)
+        paths.append(p)
+    resultados, global_ = lex_files(paths, workers=workers)
+    assert [r.caminho for r in resultados] == paths
+    for r, fonte in zip(resultados, fontes):
+        sc = Scanner(fonte)
+        assert list(r.tokens()) == sc.scan_all()
+        assert r.symbols == sc.symbols
+    # a tabela global equivale a analisar os arquivos concatenados
+    sc = Scanner('\n'.join(fontes))
+    sc.scan_all()
+    assert global_ == sc.symbols
+    assert resultados[1].ids_globais[resultados[1].symbols['main']['id']] == global_['main']['id']
+
+def test_merge_symbols():
+    a = {'x': {'id': 1, 'count': 2}, 'y': {'id': 2, 'count': 1}}
+    b = {'z': {'id': 1, 'count': 1}, 'x': {'id': 2, 'count': 5}}
+    global_, mapas = merge_symbols([a, b])
+    assert global_ == {'x': {'id': 1, 'count': 7}, 'y': {'id': 2, 'count': 1}, 'z': {'id': 3, 'count': 1}}
+    assert mapas == [[0, 1, 2], [0, 3, 1]]
+
+def test_split_points_fora_de_literais_e_comentarios():
+    fonte = 'a\n"x\ny\nz"\n/* 1\n2\n3 */\n#d \\\nb\n'
+    pontos = split_points(fonte, 8)
+    assert pontos[0] == 0 and pontos[-1] == len(fonte)
+    assert pontos == [0, 10, 22, len(fonte)]
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_scan_parallel_igual_ao_sequencial(workers):
+    fonte = '\n'.join(casos_dificeis * 5)
+    esperado = Scanner(fonte)
+    esperado.scan_all()
+    for partes in (2, 5, 40):
+        sc = scan_parallel(fonte, workers=workers, partes=partes)
+        assert sc.tokens == esperado.tokens
+        assert sc.symbols == esperado.symbols
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+from lexer_cliente import AsyncLexerClient, LexerClient, LexerServiceError
+from lexer_manual import Scanner
+from lexer_metricas import LexerMetrics
+from lexer_servico import LexerServer
+from test_lexer import codigo, codigo2, codigo3, codigo4
+
+def esperado(fonte):
+    sc = Scanner(fonte)
+    sc.scan_all()
+    return [(t.tipo, t.lexema, t.inicio) for t in sc.tokens], sc.symbols
+
+def como_tuplas(resultado):
+    tokens, symbols = resultado
+    return [(t.tipo, t.lexema, t.inicio) for t in tokens], symbols
+
+def test_servico_tcp():
+    async def cenario():
+        metricas = LexerMetrics()
+        servidor = LexerServer(workers=1, limite_grande=200, metricas=metricas)  # codigo4 vai sozinho
+        await servidor.start('127.0.0.1', 0)
+        endereco = servidor.enderecos[0][:2]
+        try:
+            cliente = await AsyncLexerClient.connect(endereco)
+            fontes = [codigo, codigo2, codigo3, codigo4] * 5
+            resultados = await asyncio.gather(*(cliente.scan(f) for f in fontes))
+            assert [como_tuplas(r) for r in resultados] == [esperado(f) for f in fontes]
+            with pytest.raises(LexerServiceError):
+                await cliente.scan('int a;', engine='nenhum')
+            await cliente.close()
+
+            def sincrono():
+                with LexerClient(endereco) as c:
+                    return c.scan_many([codigo2, codigo3])
+            assert [como_tuplas(r) for r in await asyncio.to_thread(sincrono)] == [esperado(codigo2), esperado(codigo3)]
+
+            reader, writer = await asyncio.open_connection(*endereco)
+            writer.write(b'{"id": 7}\nnao e json\n')
+            await writer.drain()
+            respostas = [json.loads(await reader.readline()) for _ in range(2)]
+            assert respostas[0]['id'] == 7 and 'erro' in respostas[0] and 'erro' in respostas[1]
+            writer.close()
+        finally:
+            await servidor.close()
+        assert metricas.arquivos == 22
+    asyncio.run(cenario())
+
+def test_servico_unix(tmp_path):
+    async def cenario():
+        caminho = str(tmp_path / 'lexer.sock')
+        servidor = LexerServer(workers=1)
+        await servidor.start(caminho=caminho)
+        try:
+            cliente = await AsyncLexerClient.connect(caminho)
+            assert como_tuplas(await cliente.scan(codigo4)) == esperado(codigo4)
+            await cliente.close()
+        finally:
+            await servidor.close()
+    asyncio.run(cenario())
+
+def test_servico_requisicao_grande():
+    async def cenario():
+        servidor = LexerServer(workers=1, max_requisicao=400 << 10)
+        await servidor.start('127.0.0.1', 0)
+        endereco = servidor.enderecos[0][:2]
+        try:
+            # maior que o limite de leitura do StreamReader, menor que max_requisicao
+            fonte = codigo4 * (200_000 // len(codigo4) + 1)
+            cliente = await AsyncLexerClient.connect(endereco)
+            assert como_tuplas(await cliente.scan(fonte)) == esperado(fonte)
+            await cliente.close()
+
+            reader, writer = await asyncio.open_connection(*endereco)
+            writer.write(json.dumps({'id': 1, 'codigo': 'x' * (500 << 10)}).encode() + b'\n')
+            await writer.drain()
+            resposta = json.loads(await reader.readline())
+            assert 'maior que' in resposta['erro'] and await reader.read() == b''
+            writer.close()
+        finally:
+            await servidor.close()
+    asyncio.run(cenario())